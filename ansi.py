@@ -0,0 +1,111 @@
+import numpy as np
+
+COLOR_MODES = ("truecolor", "256", "16")
+
+RESET = "\x1b[0m"
+
+# Channel levels of the xterm 6x6x6 color cube (indices 16-231)
+_CUBE_LEVELS = np.array([0, 95, 135, 175, 215, 255])
+_CUBE_THRESHOLDS = (_CUBE_LEVELS[:-1] + _CUBE_LEVELS[1:]) / 2
+
+# Default xterm RGB values of the 16 basic colors
+_BASIC_PALETTE = np.array([
+    (0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0),
+    (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+    (127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+    (92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+], dtype=np.int32)
+
+_ESCAPES_256 = [f"\x1b[38;5;{index}m" for index in range(256)]
+_ESCAPES_16 = [f"\x1b[{30 + index}m" for index in range(8)] + [f"\x1b[{90 + index}m" for index in range(8)]
+
+def color_mode(color):
+    """Normalize the converter's ``color`` argument to one of COLOR_MODES or None."""
+    if not color:
+        return None
+    if color is True:
+        return "truecolor"
+    color = str(color)
+    if color not in COLOR_MODES:
+        raise ValueError(f"Unsupported color mode {color!r}; use one of {', '.join(COLOR_MODES)}")
+    return color
+
+def quantize(rgb, mode):
+    """Map an (height, width, 3) uint8 array to one integer color code per cell.
+
+    Codes are packed 24-bit RGB for ``truecolor`` and palette indices for the
+    ``256`` and ``16`` modes.
+    """
+    rgb = np.asarray(rgb)[..., :3].astype(np.int32)
+    if mode == "truecolor":
+        return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+    if mode == "256":
+        # Nearest cube color, channel by channel
+        steps = np.searchsorted(_CUBE_THRESHOLDS, rgb, side="right")
+        cube = _CUBE_LEVELS[steps]
+        cube_index = 16 + 36 * steps[..., 0] + 6 * steps[..., 1] + steps[..., 2]
+        cube_distance = ((rgb - cube) ** 2).sum(axis=-1)
+        # Nearest step of the 24-level gray ramp (8, 18, ..., 238)
+        gray_step = np.clip(np.rint((rgb.mean(axis=-1) - 8) / 10), 0, 23).astype(np.int32)
+        gray_value = 8 + 10 * gray_step
+        gray_distance = ((rgb - gray_value[..., None]) ** 2).sum(axis=-1)
+        return np.where(gray_distance < cube_distance, 232 + gray_step, cube_index)
+
+    if mode == "16":
+        distances = ((rgb[..., None, :] - _BASIC_PALETTE) ** 2).sum(axis=-1)
+        return distances.argmin(axis=-1)
+
+    raise ValueError(f"Unsupported color mode {mode!r}")
+
+def _escape(code, mode):
+    if mode == "truecolor":
+        return f"\x1b[38;2;{code >> 16};{(code >> 8) & 0xFF};{code & 0xFF}m"
+    if mode == "256":
+        return _ESCAPES_256[code]
+    return _ESCAPES_16[code]
+
+def render_ansi(glyph_indices, charset, rgb, mode="truecolor"):
+    """Render glyph indices as text colored with ANSI escape sequences.
+
+    Colors are quantized for the whole frame at once, and a new escape is
+    only emitted where the color changes, so a run of same-colored cells
+    (including across line breaks) shares a single sequence.
+    """
+    return "".join(iter_ansi(glyph_indices, charset, rgb, mode))
+
+def iter_ansi(glyph_indices, charset, rgb, mode="truecolor", chunk_rows=None):
+    """Yield `render_ansi` output in pieces of ``chunk_rows`` rows.
+
+    The pieces join to exactly the text `render_ansi` returns: a color run
+    crossing a chunk boundary is not re-emitted, and the reset only follows
+    the last chunk. Only one chunk's colors are quantized at a time.
+    """
+    height, width = glyph_indices.shape
+    lookup = np.frombuffer(charset.encode("ascii"), dtype=np.uint8)
+    previous = None
+    for top in range(0, height, chunk_rows or max(height, 1)):
+        bottom = min(height, top + (chunk_rows or height))
+        flat_codes = quantize(rgb[top:bottom], mode).ravel()
+        rows = np.take(lookup, glyph_indices[top:bottom]).tobytes().decode("ascii")
+        starts = np.flatnonzero(np.concatenate(([True], flat_codes[1:] != flat_codes[:-1])))
+        ends = np.append(starts[1:], flat_codes.size)
+
+        # Chunks after the first start on a new line
+        parts = ["\n"] if top else []
+        for start, end, code in zip(starts.tolist(), ends.tolist(), flat_codes[starts].tolist()):
+            if start and start % width == 0:
+                parts.append("\n")
+            # A run continuing from the previous chunk keeps its color
+            if start or code != previous:
+                parts.append(_escape(code, mode))
+            # Split the run at row boundaries without re-emitting its color
+            while start // width != (end - 1) // width:
+                row_end = (start // width + 1) * width
+                parts.append(rows[start:row_end])
+                parts.append("\n")
+                start = row_end
+            parts.append(rows[start:end])
+        previous = int(flat_codes[-1])
+        yield "".join(parts)
+    yield RESET
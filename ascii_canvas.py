@@ -0,0 +1,202 @@
+from collections import OrderedDict
+import numpy as np
+from PyQt5.QtCore import Qt, QEvent, QPoint, QRect
+from PyQt5.QtGui import QImage, QPainter, QPalette, QPixmap
+from PyQt5.QtWidgets import QAbstractScrollArea
+from rasterizer import get_atlas, rasterize
+
+# Every printable ASCII character; the canvas draws any art through one atlas of these
+CANVAS_CHARSET = "".join(chr(code) for code in range(32, 127))
+# Cells rendered together into one cached pixmap
+TILE_ROWS = 32
+TILE_COLUMNS = 64
+# Rendered tiles kept around for scrolling back
+MAX_CACHED_TILES = 96
+MIN_FONT_SIZE = 4
+MAX_FONT_SIZE = 48
+
+class AsciiCanvas(QAbstractScrollArea):
+    """Scrollable, zoomable display of ASCII art held as a grid of glyph indices.
+
+    The art is painted in tiles of ``TILE_ROWS`` x ``TILE_COLUMNS`` cells,
+    each rasterized once from the glyph atlas into a cached pixmap; a paint
+    only draws the tiles that intersect the viewport, so the cost does not
+    grow with the size of the art. When new art has the same shape as the
+    old, only tiles containing changed cells are rendered again.
+
+    Foreground and background come from the palette's Text and Base roles,
+    so style sheets theme it like a QTextEdit. Ctrl+wheel and Ctrl+plus/minus
+    zoom.
+    """
+
+    def __init__(self, parent=None, font_size=10):
+        super().__init__(parent)
+        self.font_size = font_size
+        self._atlas = get_atlas(CANVAS_CHARSET, size=font_size)
+        self._cells = np.zeros((0, 0), dtype=np.uint8)
+        self._colors = None
+        self._text = ""
+        self._tiles = OrderedDict()
+        self.setFocusPolicy(Qt.StrongFocus)
+
+    def setPlainText(self, text):
+        """Show newline-separated art; short lines are padded with spaces."""
+        self._set_cells(self._atlas.text_to_indices(text) if text else np.zeros((0, 0), dtype=np.uint8),
+                        None, text)
+
+    def toPlainText(self):
+        """The art as newline-separated text."""
+        if self._text is None:
+            rows = np.frombuffer(CANVAS_CHARSET.encode("ascii"), dtype=np.uint8)[self._cells]
+            self._text = "\n".join(row.tobytes().decode("ascii") for row in rows)
+        return self._text
+
+    def set_cells(self, glyph_indices, charset, colors=None):
+        """Show a 2-D array of indices into ``charset``, optionally with per-cell RGB colors."""
+        # Translate the converter's charset into the canvas atlas
+        lookup = self._atlas.lookup[np.frombuffer(charset.encode("ascii"), dtype=np.uint8)]
+        self._set_cells(lookup[glyph_indices], None if colors is None else np.asarray(colors)[..., :3], None)
+
+    def cell_count(self):
+        """(rows, columns) of the current art."""
+        return self._cells.shape
+
+    def _set_cells(self, cells, colors, text):
+        old_cells, old_colors = self._cells, self._colors
+        self._cells, self._colors, self._text = cells, colors, text
+        if (old_cells.shape != cells.shape or (old_colors is None) != (colors is None)):
+            self._tiles.clear()
+            self._update_scrollbars()
+        else:
+            changed = old_cells != cells
+            if colors is not None:
+                changed |= (old_colors != colors).any(axis=2)
+            self._invalidate(changed)
+        self.viewport().update()
+
+    def _invalidate(self, changed):
+        """Drop cached tiles that contain at least one changed cell."""
+        rows, columns = changed.shape
+        tile_rows = -(-rows // TILE_ROWS)
+        tile_columns = -(-columns // TILE_COLUMNS)
+        padded = np.zeros((tile_rows * TILE_ROWS, tile_columns * TILE_COLUMNS), dtype=bool)
+        padded[:rows, :columns] = changed
+        dirty = padded.reshape(tile_rows, TILE_ROWS, tile_columns, TILE_COLUMNS).any(axis=(1, 3))
+        for tile in zip(*np.nonzero(dirty)):
+            self._tiles.pop((int(tile[0]), int(tile[1])), None)
+
+    def set_font_size(self, size):
+        """Zoom to ``size`` points, keeping the cell at the viewport center in place."""
+        size = max(MIN_FONT_SIZE, min(MAX_FONT_SIZE, size))
+        if size == self.font_size:
+            return
+        old_width, old_height = self._atlas.cell_width, self._atlas.cell_height
+        center_x = (self.horizontalScrollBar().value() + self.viewport().width() / 2) / old_width
+        center_y = (self.verticalScrollBar().value() + self.viewport().height() / 2) / old_height
+
+        self.font_size = size
+        self._atlas = get_atlas(CANVAS_CHARSET, size=size)
+        self._tiles.clear()
+        self._update_scrollbars()
+        self.horizontalScrollBar().setValue(int(center_x * self._atlas.cell_width - self.viewport().width() / 2))
+        self.verticalScrollBar().setValue(int(center_y * self._atlas.cell_height - self.viewport().height() / 2))
+        self.viewport().update()
+
+    def zoom_in(self):
+        self.set_font_size(self.font_size + 1)
+
+    def zoom_out(self):
+        self.set_font_size(self.font_size - 1)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier:
+            if event.angleDelta().y() > 0:
+                self.zoom_in()
+            elif event.angleDelta().y() < 0:
+                self.zoom_out()
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.modifiers() & Qt.ControlModifier and event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.zoom_in()
+        elif event.modifiers() & Qt.ControlModifier and event.key() == Qt.Key_Minus:
+            self.zoom_out()
+        else:
+            super().keyPressEvent(event)
+
+    def _update_scrollbars(self):
+        rows, columns = self._cells.shape
+        width, height = columns * self._atlas.cell_width, rows * self._atlas.cell_height
+        viewport = self.viewport().size()
+        for bar, content, page, step in (
+                (self.horizontalScrollBar(), width, viewport.width(), self._atlas.cell_width),
+                (self.verticalScrollBar(), height, viewport.height(), self._atlas.cell_height)):
+            bar.setRange(0, max(0, content - page))
+            bar.setPageStep(page)
+            bar.setSingleStep(step * 3)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        # Theme changes arrive as palette or style changes; tiles bake the colors in
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange):
+            self._tiles.clear()
+            self.viewport().update()
+        super().changeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().color(QPalette.Base))
+        rows, columns = self._cells.shape
+        if not rows or not columns:
+            return
+
+        tile_width = TILE_COLUMNS * self._atlas.cell_width
+        tile_height = TILE_ROWS * self._atlas.cell_height
+        offset = QPoint(self.horizontalScrollBar().value(), self.verticalScrollBar().value())
+        visible = event.rect().translated(offset)
+        first_row, last_row = visible.top() // tile_height, visible.bottom() // tile_height
+        first_column, last_column = visible.left() // tile_width, visible.right() // tile_width
+        for tile_row in range(first_row, min(last_row, (rows - 1) // TILE_ROWS) + 1):
+            for tile_column in range(first_column, min(last_column, (columns - 1) // TILE_COLUMNS) + 1):
+                position = QPoint(tile_column * tile_width, tile_row * tile_height) - offset
+                painter.drawPixmap(position, self._tile(tile_row, tile_column))
+
+    def _tile(self, tile_row, tile_column):
+        """The cached pixmap of one tile, rendering it on a miss."""
+        key = (tile_row, tile_column)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+
+        rows = slice(tile_row * TILE_ROWS, (tile_row + 1) * TILE_ROWS)
+        columns = slice(tile_column * TILE_COLUMNS, (tile_column + 1) * TILE_COLUMNS)
+        palette = self.palette()
+        foreground = palette.color(QPalette.Text).getRgb()[:3]
+        background = palette.color(QPalette.Base).getRgb()[:3]
+        colors = None if self._colors is None else self._colors[rows, columns]
+        image = rasterize(self._cells[rows, columns], self._atlas, colors=colors,
+                          foreground=foreground, background=background)
+        data = image.tobytes()
+        qimage = QImage(data, image.width, image.height, image.width * 3, QImage.Format_RGB888)
+        # fromImage copies the pixels, so ``data`` may be released afterwards
+        pixmap = QPixmap.fromImage(qimage)
+
+        self._tiles[key] = pixmap
+        if len(self._tiles) > MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)
+        return pixmap
+
+    def visible_cells(self):
+        """(first row, first column, last row, last column) of the cells in view, inclusive."""
+        rect = QRect(QPoint(self.horizontalScrollBar().value(), self.verticalScrollBar().value()),
+                     self.viewport().size())
+        rows, columns = self._cells.shape
+        return (rect.top() // self._atlas.cell_height, rect.left() // self._atlas.cell_width,
+                min(rows - 1, rect.bottom() // self._atlas.cell_height),
+                min(columns - 1, rect.right() // self._atlas.cell_width))
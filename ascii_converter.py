@@ -1,34 +1,196 @@
 from PIL import Image, ImageEnhance, ImageFilter
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
+import hashlib
+import io
 import logging
+import os
+import shutil
+import time
+import instrumentation
+from ansi import color_mode, render_ansi
+from ascii_result import AsciiResult
+from filter_stack import FILTERS, apply_filter, filter_halo
+from result_cache import file_digest
+from tone import blend_table, gamma_table, histogram_mean, tone_table
+
+# Applications decide where (and whether) log records go
+logger = logging.getLogger(__name__)
+
+
+# Rows of the summed-area tables held at once by local_std
+LOCAL_STD_STRIP_ROWS = 64
+# Cells mapped per chunk by the glyph stage, bounding its scratch buffers
+GLYPH_CHUNK_CELLS = 1 << 18
+# Tiled (multi-threaded) stages split images into row bands of at least this many rows
+TILE_MIN_ROWS = 64
+# Rows the radius-1 Gaussian blur of the intensity map reaches beyond a band
+BLUR_HALO_ROWS = 4
+
+
+def local_std(array, window_size=3, out=None):
+    """Standard deviation of every full ``window_size`` x ``window_size`` window.
+
+    Uses summed-area tables of the values and their squares, so the cost is a
+    few whole-array passes regardless of the window size. Returns an array of
+    shape ``(height - window_size + 1, width - window_size + 1)``; entry
+    ``[y, x]`` belongs to the window whose top-left corner is ``(y, x)``.
+    Results are written into ``out`` when given.
+
+    The tables are built for strips of ``LOCAL_STD_STRIP_ROWS`` output rows
+    (plus the rows their windows overlap), so the float64 temporaries stay
+    small however large the image is.
+    """
+    values = np.asarray(array)
+    height, width = values.shape
+    out_shape = (max(0, height - window_size + 1), max(0, width - window_size + 1))
+    if out is None:
+        out = np.zeros(out_shape, dtype=np.float32)
+    if height < window_size or width < window_size:
+        return out
+
+    for top in range(0, out_shape[0], LOCAL_STD_STRIP_ROWS):
+        bottom = min(out_shape[0], top + LOCAL_STD_STRIP_ROWS)
+        out[top:bottom] = _strip_std(values[top:bottom + window_size - 1], window_size)
+    return out
+
+
+def _strip_std(strip, window_size):
+    values = np.asarray(strip, dtype=np.float64)
+    height, width = values.shape
+
+    def box_sum(data):
+        table = np.zeros((height + 1, width + 1), dtype=np.float64)
+        np.cumsum(data, axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        w = window_size
+        return table[w:, w:] - table[:-w, w:] - table[w:, :-w] + table[:-w, :-w]
+
+    count = window_size * window_size
+    sums = box_sum(values)
+    squares = box_sum(values * values)
+    # (n * sum(x^2) - sum(x)^2) / n^2 is exact for integer-valued pixels
+    variance = (count * squares - sums * sums) / (count * count)
+    np.maximum(variance, 0, out=variance)
+    return np.sqrt(variance)
+
+
+def _stage_key(stage, parent_key, *params):
+    """Cache key for a pipeline stage, or None when its input is not cacheable."""
+    if parent_key is None:
+        return None
+    return (stage, parent_key) + params
+
+
+class _Identity:
+    """Hashable stand-in for an in-memory source, compared by identity.
+
+    It keeps the object alive while a cache key refers to it, so the id can
+    never be reused for a different image.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+
+@functools.lru_cache(maxsize=None)
+def _thread_pool(threads):
+    """Thread pool shared by every converter tiling its stages over ``threads`` threads."""
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="artascii-tile")
+
+
+class ConversionCancelled(Exception):
+    """Raised between stages when the converter's ``should_stop`` callback returns true."""
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, 
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    filename='ascii_converter.log',
-                    filemode='w')
 
 class ASCIIConverter:
+    # Decode at least this many source pixels per output pixel so the final
+    # LANCZOS resize still has real detail to work with (as Image.thumbnail does)
+    DECODE_REDUCING_GAP = 2.0
+
     def __init__(self, image_path, output_width=100, density="medium", color=False, 
-                 brightness=1.0, contrast=1.0, invert=False, detail_preservation=0.7):
-        logging.info(f"Initializing ASCIIConverter with params: "
-                     f"image_path={image_path}, output_width={output_width}, "
-                     f"density={density}, color={color}, brightness={brightness}, "
-                     f"contrast={contrast}, invert={invert}, "
-                     f"detail_preservation={detail_preservation}")
+                 brightness=1.0, contrast=1.0, invert=False, detail_preservation=0.7,
+                 intensity_window=3, reference=False, cache=None, fast_decode=True,
+                 result_cache=None, glyph_mode="luminance", decode_width=None, should_stop=None,
+                 threads=1, gamma=1.0, filters=()):
+        logger.debug("Initializing ASCIIConverter with params: image_path=%s, output_width=%s, "
+                     "density=%s, color=%s, brightness=%s, contrast=%s, gamma=%s, invert=%s, "
+                     "detail_preservation=%s, intensity_window=%s, reference=%s",
+                     image_path, output_width, density, color, brightness, contrast, gamma, invert,
+                     detail_preservation, intensity_window, reference)
         
+        if intensity_window < 1 or intensity_window % 2 == 0:
+            raise ValueError(f"intensity_window must be a positive odd number, got {intensity_window}")
+        if glyph_mode not in ("luminance", "shape"):
+            raise ValueError(f"glyph_mode must be 'luminance' or 'shape', got {glyph_mode!r}")
+        unknown = [name for name in filters if name not in FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown filters {unknown}; choose from {', '.join(FILTERS)}")
+        if gamma <= 0:
+            raise ValueError(f"gamma must be positive, got {gamma}")
+        if threads is not None and threads < 1:
+            raise ValueError(f"threads must be at least 1, got {threads}")
+        
+
         self.image_path = image_path
         self.output_width = output_width
         self.density = density
         self.color = color
+        # None for plain text, otherwise "truecolor", "256" or "16"
+        self.color_mode = color_mode(color)
         self.brightness = brightness
         self.contrast = contrast
         self.invert = invert
+        # Midtone curve applied after contrast: above 1 lightens, below 1 darkens
+        self.gamma = gamma
+        # Names from filter_stack.FILTERS, applied in order to the resized image
+        self.filters = tuple(filters)
         self.detail_preservation = detail_preservation
+        self.intensity_window = intensity_window
+        # Use the original loop-based implementations (slow; kept for comparison)
+        self.reference = reference
+        # Optional StageCache shared between converters, e.g. across GUI slider changes
+        self.cache = cache
+        # Let the decoder skip resolution the output can never use
+        self.fast_decode = fast_decode
+        # Width the decode resolution is chosen for, when it should differ from
+        # output_width (e.g. so a preview shares the final pass's decode)
+        self.decode_width = decode_width
+        # Polled before every stage; returning True aborts with ConversionCancelled
+        self.should_stop = should_stop
+        # Optional on-disk ResultCache of finished art, shared across runs and processes
+        self.result_cache = result_cache
+        # "luminance" ranks a short ramp by brightness; "shape" matches every
+        # printable character against sub-cell blocks of the image
+        self.glyph_mode = glyph_mode
+        # Threads the adjust, intensity and glyph stages of large images are
+        # split over, in row bands; None uses every CPU. Output is identical.
+        self.threads = (os.cpu_count() or 1) if threads is None else threads
+        # Filled in by every real (uncached) decode
+        self.decode_stats = None
+        # Output size of the last glyph mapping, e.g. to track escape-code overhead
+        self.render_stats = None
+        # Per-level timings of the last convert_widths
+        self.pyramid_stats = None
         self.ascii_chars = self._get_ascii_chars()
+        # Glyph lookup table and scratch arrays, reused across conversions
+        self._glyph_lookup = np.frombuffer(self.ascii_chars.encode('ascii'), dtype=np.uint8)
+        self._scratch = {}
 
     def _get_ascii_chars(self):
         """Return ASCII characters based on density and detail level."""
+        if self.glyph_mode == "shape":
+            from glyph_matching import SHAPE_CHARSET
+            return SHAPE_CHARSET
+        
         detailed_chars = "@%#*+=-:. "
         sparse_chars = "@#%*+=-:. "
         
@@ -39,15 +201,104 @@ class ASCIIConverter:
         else:  # medium
             return "@#%*+=-:. "
 
-    def _resize_image(self, image):
-        """Resize the image while maintaining aspect ratio."""
-        width, height = image.size
+    def _target_size(self, source_size, output_width=None):
+        """Output size in characters for a source of the given pixel size."""
+        output_width = output_width or self.output_width
+        width, height = source_size
         aspect_ratio = height / width
-        new_height = int(self.output_width * aspect_ratio * 0.55)  # Adjust for font aspect ratio
-        return image.resize((self.output_width, new_height), Image.LANCZOS)
+        new_height = int(output_width * aspect_ratio * 0.55)  # Adjust for font aspect ratio
+        return output_width, new_height
+
+    def _pixel_size(self, source_size, output_width=None):
+        """Size the image is resized to: one pixel per cell, or a block of sub-cells in shape mode."""
+        width, height = self._target_size(source_size, output_width)
+        if self.glyph_mode == "shape":
+            from glyph_matching import DEFAULT_GRID
+            return width * DEFAULT_GRID[1], height * DEFAULT_GRID[0]
+        return width, height
+
+    def _resize_image(self, image, source_size=None):
+        """Resize the image while maintaining aspect ratio.
+
+        ``source_size`` is the size of the original file when ``image`` was
+        decoded at reduced resolution, so the output shape does not depend on
+        how the decoder rounded.
+        """
+        return image.resize(self._pixel_size(source_size or image.size), Image.LANCZOS)
+
+    def _open_image(self, source=None):
+        """Decode the source at the smallest resolution the output still needs.
+
+        JPEG files are decoded with draft mode (DCT scaling by 1/2, 1/4 or 1/8);
+        other formats are fully decoded and then shrunk by an integer factor
+        with ``reduce``. Returns the RGB image and the original size, and
+        records timings and buffer sizes in ``decode_stats``.
+        """
+        started = time.perf_counter()
+        source = self.image_path if source is None else source
+        if isinstance(source, Image.Image):
+            image, method = source, "memory"
+        elif isinstance(source, np.ndarray):
+            image, method = Image.fromarray(source), "memory"
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            image, method = Image.open(io.BytesIO(source)), "full"
+        else:
+            image, method = Image.open(source), "full"
+        source_size = image.size
+        
+        if self.fast_decode:
+            needed = self._decode_size(source_size, self.decode_width)
+            # Only files opened here are still undecoded and safe to put in draft mode
+            if method == "full" and image.format == "JPEG":
+                image.draft("RGB", needed)
+                if image.size != source_size:
+                    method = "draft"
+            image = image.convert("RGB")
+            decoded_size = image.size
+            reduced = self._reduce_to(image, needed)
+            if reduced is not image:
+                image = reduced
+                method += "+reduce"
+        else:
+            image = image.convert("RGB")
+            decoded_size = image.size
+        
+        instrumentation.count("source_pixels", source_size[0] * source_size[1])
+        instrumentation.count("decoded_pixels", decoded_size[0] * decoded_size[1])
+        self.decode_stats = {
+            "method": method,
+            "source_size": source_size,
+            "decoded_size": decoded_size,
+            "output_size": image.size,
+            # RGB pixels are held in 4-byte slots by Pillow
+            "decoded_bytes": decoded_size[0] * decoded_size[1] * 4,
+            "full_decode_bytes": source_size[0] * source_size[1] * 4,
+            "seconds": time.perf_counter() - started,
+        }
+        logger.debug("Image decoded: %s", self.decode_stats)
+        return image, source_size
+
+    def _decode_size(self, source_size, output_width=None):
+        """Smallest decoded size that still leaves the final resize real detail to work with."""
+        target_width, target_height = self._pixel_size(source_size, output_width)
+        return (max(1, int(target_width * self.DECODE_REDUCING_GAP)),
+                max(1, int(target_height * self.DECODE_REDUCING_GAP)))
+
+    @staticmethod
+    def _reduce_to(image, needed):
+        """Shrink ``image`` by the largest integer factor that keeps it at least ``needed``."""
+        factor = min(image.width // needed[0], image.height // needed[1])
+        return image.reduce(factor) if factor >= 2 else image
 
     def _adjust_image(self, image):
-        """Advanced image adjustment with edge preservation."""
+        """Advanced image adjustment with edge preservation: the edge and tone stages uncached."""
+        if self.reference:
+            return self._adjust_image_reference(image)
+        edges = self._enhance_edges(image)
+        return self._apply_tone(edges, self._tone_mean(edges) if self.contrast != 1 else 0)
+
+    def _adjust_image_reference(self, image):
+        """Step-by-step version of `_adjust_image`, one full image per step."""
         # Apply edge enhancement to preserve details
         edge_enhanced = image.filter(ImageFilter.EDGE_ENHANCE)
         
@@ -57,12 +308,92 @@ class ASCIIConverter:
         enhancer = ImageEnhance.Contrast(image)
         image = enhancer.enhance(self.contrast)
         
+        if self.gamma != 1:
+            image = image.point(gamma_table(self.gamma).tolist() * len(image.getbands()))
+        
         # Invert if needed
         if self.invert:
             image = Image.eval(image, lambda x: 255 - x)
         
         return image
 
+    def _apply_filter(self, image, name):
+        """Filter stage: one filter of the user's stack, at working resolution."""
+        bands = self._tile_bands(image.height)
+        if bands is not None:
+            return self._tiled_image(image, bands, lambda part: apply_filter(part, name), halo=filter_halo(name))
+        return apply_filter(image, name)
+
+    def _enhance_edges(self, image):
+        """Edge stage: the 3x3 ``EDGE_ENHANCE`` filter that keeps detail through the glyph mapping."""
+        bands = self._tile_bands(image.height)
+        if bands is not None:
+            return self._tiled_image(image, bands, lambda part: part.filter(ImageFilter.EDGE_ENHANCE), halo=1)
+        return image.filter(ImageFilter.EDGE_ENHANCE)
+
+    def _tone_mean(self, edges):
+        """Mean gray of the brightened image, the pivot of the contrast adjustment.
+
+        Only depends on the brightness, so contrast, gamma and invert changes reuse it.
+        """
+        brighten = blend_table(self.brightness, 0).tolist() * len(edges.getbands())
+        
+        def gray_histogram(part):
+            if self.brightness != 1:
+                part = part.point(brighten)
+            return part.convert("L").histogram()
+        
+        bands = self._tile_bands(edges.height)
+        if bands is None:
+            return histogram_mean(gray_histogram(edges))
+        parts = [edges.crop((0, top, edges.width, bottom)) for top, bottom in bands]
+        histograms = list(_thread_pool(self.threads).map(gray_histogram, parts))
+        return histogram_mean([sum(counts) for counts in zip(*histograms)])
+
+    def _apply_tone(self, edges, mean):
+        """Tone stage: brightness, contrast, gamma and invert as one lookup table in one pass."""
+        table = tone_table(self.brightness, self.contrast, self.invert, self.gamma, mean)
+        if np.array_equal(table, np.arange(256)):
+            return edges
+        lut = table.tolist() * len(edges.getbands())
+        bands = self._tile_bands(edges.height)
+        if bands is not None:
+            return self._tiled_image(edges, bands, lambda part: part.point(lut))
+        return edges.point(lut)
+
+    def _tile_bands(self, height):
+        """(top, bottom) row bands to split a stage over, or None to run it in one piece."""
+        if self.threads < 2 or self.reference or height < 2 * TILE_MIN_ROWS:
+            return None
+        count = min(self.threads, height // TILE_MIN_ROWS)
+        edges = [height * index // count for index in range(count + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+
+    @staticmethod
+    def _crop_band(image, top, bottom, halo):
+        """Crop rows ``top:bottom`` plus up to ``halo`` neighbouring rows on each side.
+
+        Returns the crop and the number of halo rows above the band.
+        """
+        above, below = min(halo, top), min(halo, image.height - bottom)
+        return image.crop((0, top - above, image.width, bottom + below)), above
+
+    def _tiled_image(self, image, bands, function, halo=0):
+        """Apply an image-to-image ``function`` band by band on the thread pool and stitch the results.
+
+        Each band is cropped with up to ``halo`` extra rows per side, enough
+        for ``function``'s filter window, which are dropped again afterwards.
+        """
+        def run(band):
+            part, above = self._crop_band(image, band[0], band[1], halo)
+            part = function(part)
+            return part.crop((0, above, part.width, above + band[1] - band[0])) if halo else part
+        
+        output = Image.new(image.mode, image.size)
+        for (top, _), part in zip(bands, _thread_pool(self.threads).map(run, bands)):
+            output.paste(part, (0, top))
+        return output
+
     def _advanced_pixel_to_ascii(self, pixel, intensity_map):
         """Convert a pixel to an ASCII character with shape preservation."""
         try:
@@ -89,93 +420,553 @@ class ASCIIConverter:
             return self.ascii_chars[intensity_index]
         
         except Exception as e:
-            logging.error(f"Error in pixel to ASCII conversion: {e}", exc_info=True)
+            logger.error("Error in pixel to ASCII conversion: %s", e, exc_info=True)
             # Return a default character if conversion fails
             return self.ascii_chars[len(self.ascii_chars) // 2]
 
     def _create_intensity_map(self, image):
         """Create an intensity map that preserves local image details."""
         try:
+            bands = self._tile_bands(image.height)
+            if bands is not None:
+                return self._create_intensity_map_tiled(image, bands)
+            
             # Convert image to grayscale
             gray_image = image.convert('L')
-            gray_array = np.array(gray_image, dtype=np.float32)
             
             # Apply Gaussian blur to reduce noise
             blurred = gray_image.filter(ImageFilter.GaussianBlur(radius=1))
-            blurred_array = np.array(blurred, dtype=np.float32)
-            
-            # Compute local intensity variations using more efficient method
-            height, width = gray_array.shape
-            intensity_map = np.zeros_like(gray_array)
-            
-            # Use sliding window for local intensity calculation
-            window_size = 3
-            half_window = window_size // 2
             
-            for y in range(half_window, height - half_window):
-                for x in range(half_window, width - half_window):
-                    local_region = blurred_array[
-                        y - half_window:y + half_window + 1, 
-                        x - half_window:x + half_window + 1
-                    ]
-                    # Calculate local variation using standard deviation
-                    intensity_map[y, x] = np.std(local_region)
+            if self.reference:
+                intensity_map = self._local_variation_reference(np.array(blurred, dtype=np.float32))
+            else:
+                # local_std converts strip by strip, so the 8-bit pixels are passed as they are
+                intensity_map = self._local_variation(np.asarray(blurred))
             
-            # Normalize intensity map
-            if intensity_map.max() > intensity_map.min():
-                intensity_map = (intensity_map - intensity_map.min()) / (intensity_map.max() - intensity_map.min())
+            # Normalize intensity map (in place; same float32 operations as before)
+            low, high = intensity_map.min(), intensity_map.max()
+            if high > low:
+                intensity_map -= low
+                intensity_map /= high - low
             
             return intensity_map
         
         except Exception as e:
-            logging.error(f"Error creating intensity map: {e}", exc_info=True)
+            logger.error("Error creating intensity map: %s", e, exc_info=True)
             # Return a uniform map if computation fails
             return np.ones_like(np.array(image.convert('L')), dtype=np.float32) * 0.5
 
-    def convert_to_ascii(self):
-        """Convert the image to ASCII art with advanced shape preservation."""
+    def _create_intensity_map_tiled(self, image, bands):
+        """`_create_intensity_map` over row bands on the thread pool, with identical values.
+
+        Each band is blurred and measured with enough halo rows for the blur
+        and the variation window, then normalized by the minimum and maximum
+        of the whole map.
+        """
+        pool = _thread_pool(self.threads)
+        halo = BLUR_HALO_ROWS + self.intensity_window // 2
+        intensity_map = np.empty((image.height, image.width), dtype=np.float32)
+        
+        def band_variation(band):
+            top, bottom = band
+            part, above = self._crop_band(image, top, bottom, halo)
+            blurred = part.convert('L').filter(ImageFilter.GaussianBlur(radius=1))
+            variation = self._local_variation(np.asarray(blurred))
+            intensity_map[top:bottom] = variation[above:above + bottom - top]
+            return intensity_map[top:bottom].min(), intensity_map[top:bottom].max()
+        
+        extremes = list(pool.map(band_variation, bands))
+        low, high = min(low for low, _ in extremes), max(high for _, high in extremes)
+        if high > low:
+            def normalize(band):
+                values = intensity_map[band[0]:band[1]]
+                values -= low
+                values /= high - low
+            list(pool.map(normalize, bands))
+        return intensity_map
+
+    def _local_variation(self, blurred_array):
+        """Local standard deviation around each pixel, computed over whole arrays.
+
+        Pixels closer than half a window to the border are left at zero, as in
+        the reference implementation.
+        """
+        height, width = blurred_array.shape
+        half_window = self.intensity_window // 2
+        intensity_map = np.zeros((height, width), dtype=np.float32)
+        if height > 2 * half_window and width > 2 * half_window:
+            local_std(blurred_array, self.intensity_window,
+                      out=intensity_map[half_window:height - half_window, half_window:width - half_window])
+        return intensity_map
+
+    def _local_variation_reference(self, blurred_array):
+        """Per-pixel sliding-window version of `_local_variation`."""
+        height, width = blurred_array.shape
+        intensity_map = np.zeros_like(blurred_array)
+        
+        # Use sliding window for local intensity calculation
+        half_window = self.intensity_window // 2
+        
+        for y in range(half_window, height - half_window):
+            for x in range(half_window, width - half_window):
+                local_region = blurred_array[
+                    y - half_window:y + half_window + 1, 
+                    x - half_window:x + half_window + 1
+                ]
+                # Calculate local variation using standard deviation
+                intensity_map[y, x] = np.std(local_region)
+        
+        return intensity_map
+
+    def convert_to_ascii(self, source=None):
+        """Convert the image to ASCII art with advanced shape preservation.
+
+        ``source`` defaults to the converter's ``image_path`` and may be a file
+        path, encoded image bytes, a PIL Image or a NumPy array. Errors are
+        returned as text; only `ConversionCancelled` is raised.
+        """
         try:
-            logging.info(f"Starting image conversion: {self.image_path}")
-            
-            # Open and prepare the image
-            image = Image.open(self.image_path).convert("RGB")
-            logging.info(f"Image opened. Original size: {image.size}")
-            
-            image = self._resize_image(image)
-            logging.info(f"Image resized. New size: {image.size}")
-            
-            image = self._adjust_image(image)
-            logging.info("Image adjusted")
-            
-            # Create intensity map for detail preservation
-            intensity_map = self._create_intensity_map(image)
-            logging.info(f"Intensity map created. Shape: {intensity_map.shape if intensity_map is not None else 'None'}")
-            
-            # Convert image to pixel data
-            pixels = list(image.getdata())
-            logging.info(f"Total pixels: {len(pixels)}")
-            
-            # Convert pixels to ASCII
-            ascii_art = []
-            for i in range(image.height):
-                row = []
-                for j in range(image.width):
-                    pixel_index = i * image.width + j
-                    pixel = pixels[pixel_index]
-                    
-                    # Safely get local intensity
-                    if intensity_map is not None:
-                        local_intensity = intensity_map[min(i, intensity_map.shape[0]-1), 
-                                                       min(j, intensity_map.shape[1]-1)]
-                    else:
-                        local_intensity = None
-                    
-                    row.append(self._advanced_pixel_to_ascii(pixel, local_intensity))
-                ascii_art.append(''.join(row))
-            
-            logging.info("Image conversion completed successfully")
-            return '\n'.join(ascii_art)
+            return self._convert(source)
         
+        except ConversionCancelled:
+            raise
         except Exception as e:
-            logging.error(f"Error converting image: {e}", exc_info=True)
+            logger.error("Error converting image: %s", e, exc_info=True)
             return f"Error converting image: {e}"
+
+    def convert(self, source=None):
+        """Convert the source into an `AsciiResult`, letting errors propagate.
+
+        Unlike `convert_to_ascii` no text is built: the result holds one byte
+        per cell (plus the cell colors in color mode) and produces text on
+        demand. The result cache is not consulted; see `write_ascii`.
+        """
+        logger.debug("Starting image conversion: %s", self.image_path if source is None else type(source).__name__)
+        instrumentation.count("conversions")
+        glyph_indices, colors = self._convert_cells(source, with_colors=bool(self.color_mode))
+        return AsciiResult(glyph_indices, self.ascii_chars, colors, self.color_mode)
+
+    def write_ascii(self, file, source=None):
+        """Convert the source and stream the art into a text file object, letting errors propagate.
+
+        Text is written a chunk of rows at a time, so even huge art is never
+        held as one string. A result cache hit is copied straight from the
+        cache file; on a miss the chunks go to ``file`` and into the cache in
+        the same pass. Returns the number of characters written.
+        """
+        result_key = self._result_key(source) if self.result_cache is not None else None
+        if result_key is not None:
+            cached = self.result_cache.open(result_key)
+            if cached is not None:
+                instrumentation.count("result_cache_hits")
+                with cached:
+                    shutil.copyfileobj(cached, file)
+                    return cached.tell()
+            instrumentation.count("result_cache_misses")
+        
+        result = self.convert(source)
+        if result_key is None:
+            written = result.write(file)
+        else:
+            written = 0
+            with self.result_cache.writer(result_key) as entry:
+                for chunk in result.iter_chunks():
+                    file.write(chunk)
+                    entry.write(chunk)
+                    written += len(chunk)
+        self._record_render_stats(result.glyph_indices.size, written)
+        return written
+
+    def convert_many(self, sources):
+        """Lazily convert several sources with the same settings and lookup tables."""
+        for source in sources:
+            yield self.convert_to_ascii(source)
+
+    def convert_widths(self, widths, source=None):
+        """Convert the source at several output widths from a single decode.
+
+        The source is decoded once, for the widest rendition, and every
+        narrower level is shrunk from the next wider one (by an integer
+        ``reduce`` where that still leaves the resize enough detail) instead
+        of from the file. Resizing, adjustment, the intensity map and glyph
+        mapping depend on the output resolution (the edge filter and the
+        contrast mean are not scale-invariant), so they run per width.
+
+        Returns a dict of `AsciiResult` keyed by width, widest first, and
+        records timings in ``pyramid_stats``. With ``fast_decode`` the
+        narrower renditions may differ by a glyph here and there from
+        separate conversions, which decode at their own resolution. Errors
+        propagate and the result cache is not consulted.
+        """
+        widths = sorted(set(widths), reverse=True)
+        if not widths or widths[-1] < 1:
+            raise ValueError(f"widths must be positive, got {widths}")
+        logger.debug("Starting pyramid conversion at widths %s", widths)
+        instrumentation.count("conversions", len(widths))
+        
+        started = time.perf_counter()
+        widest = self._with_width(widths[0])
+        image, source_size, level_key = widest._decode(source)
+        decode_seconds = time.perf_counter() - started
+        
+        results = {}
+        levels = []
+        for width in widths:
+            level_started = time.perf_counter()
+            converter = self._with_width(width)
+            if self.fast_decode:
+                level_key = _stage_key("pyramid", level_key, width)
+                needed = converter._decode_size(source_size)
+                image = converter._cached("pyramid", level_key, lambda: self._reduce_to(image, needed))
+            glyph_indices, colors = converter._cells(image, source_size, level_key, bool(self.color_mode))
+            results[width] = AsciiResult(glyph_indices, self.ascii_chars, colors, self.color_mode)
+            levels.append({"width": width, "level_size": image.size,
+                           "seconds": time.perf_counter() - level_started})
+        
+        self.decode_stats = widest.decode_stats
+        self.pyramid_stats = {
+            "decode_seconds": decode_seconds,
+            "levels": levels,
+            "seconds": time.perf_counter() - started,
+        }
+        return results
+
+    def _with_width(self, output_width):
+        """Copy of this converter for another output width, sharing caches and scratch buffers."""
+        converter = copy.copy(self)
+        converter.output_width = output_width
+        converter.decode_width = None
+        return converter
+
+    def _convert(self, source=None):
+        """Run the conversion pipeline, letting errors propagate to the caller."""
+        logger.debug("Starting image conversion: %s", self.image_path if source is None else type(source).__name__)
+        instrumentation.count("conversions")
+        
+        result_key = self._result_key(source) if self.result_cache is not None else None
+        if result_key is not None:
+            ascii_art = self.result_cache.get(result_key)
+            if ascii_art is not None:
+                logger.debug("Result cache hit: %s", result_key)
+                instrumentation.count("result_cache_hits")
+                return ascii_art
+            instrumentation.count("result_cache_misses")
+        
+        # Open and prepare the image
+        image, source_size, decode_key = self._decode(source)
+        logger.debug("Image opened. Original size: %s", source_size)
+        
+        ascii_art = self._render(image, source_size, decode_key)
+        if result_key is not None:
+            self.result_cache.put(result_key, ascii_art)
+        return ascii_art
+
+    def _result_key(self, source=None):
+        """Result cache key from the encoded bytes and every setting that affects the output.
+
+        Returns None for in-memory images and arrays, which have no encoded
+        form to hash cheaply.
+        """
+        source = self.image_path if source is None else source
+        if isinstance(source, (Image.Image, np.ndarray)):
+            return None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            content_digest = hashlib.sha256(source).hexdigest()
+        else:
+            # Remembered per path, mtime and size, so slider changes do not rehash the file
+            content_digest = file_digest(source)
+        params = {
+            "output_width": self.output_width,
+            "density": self.density,
+            "color": self.color_mode,
+            "brightness": self.brightness,
+            "contrast": self.contrast,
+            "invert": bool(self.invert),
+            "gamma": self.gamma,
+            "filters": list(self.filters),
+            "detail_preservation": self.detail_preservation,
+            "intensity_window": self.intensity_window,
+            "fast_decode": self.fast_decode,
+            "decode_width": self.decode_width,
+            "glyph_mode": self.glyph_mode,
+        }
+        return self.result_cache.digest_key(content_digest, params)
+
+    def _decode(self, source=None):
+        """Decode stage; returns the image, its original size and the stage key."""
+        # Every stage is keyed on its own parameters plus the key of its input,
+        # so with a shared cache only the stages after a change are recomputed
+        source_key = self._source_key(source) if self.cache is not None else None
+        decode_width = self.decode_width or self.output_width
+        decode_key = _stage_key("decode", source_key, decode_width if self.fast_decode else None,
+                                self.glyph_mode)
+        image, source_size = self._cached("decode", decode_key, lambda: self._open_image(source))
+        return image, source_size, decode_key
+
+    def _render(self, image, source_size, decode_key=None):
+        """Run every stage after decoding and return the final text.
+
+        Stages are only cached when ``decode_key`` identifies the source.
+        """
+        if self.glyph_mode == "shape":
+            glyph_indices, colors, match_key = self._prepare_shapes(image, source_size, decode_key)
+            glyph_key = _stage_key("glyphs", match_key, self.color_mode)
+            return self._cached("glyph_map", glyph_key, lambda: self._shapes_to_text(glyph_indices, colors))
+        
+        image, intensity_map, prepare_key = self._prepare(image, source_size, decode_key)
+        glyph_key = _stage_key("glyphs", prepare_key, self.ascii_chars, self.detail_preservation,
+                               self.color_mode)
+        
+        ascii_art = self._cached("glyph_map", glyph_key, lambda: self._map_glyphs(image, intensity_map))
+        
+        logger.debug("Image conversion completed successfully")
+        return ascii_art
+
+    def _prepare(self, image, source_size, decode_key=None):
+        """Resize and adjust a decoded image, plus the intensity map in reference mode.
+
+        Returns the adjusted image, the intensity map (None outside reference
+        mode, whose array glyph mapping never reads it) and the stage key
+        (None when uncached) for the glyph stage to build on.
+        """
+        image, adjust_key = self._resize_and_adjust(image, source_size, decode_key)
+        if not self.reference:
+            return image, None, adjust_key
+        intensity_key = _stage_key("intensity", adjust_key, self.intensity_window, self.reference)
+        
+        # Create intensity map for detail preservation
+        intensity_map = self._cached("intensity_map", intensity_key, lambda: self._create_intensity_map(image))
+        logger.debug("Intensity map created. Shape: %s", getattr(intensity_map, "shape", None))
+        
+        return image, intensity_map, intensity_key
+
+    def _resize_and_adjust(self, image, source_size, decode_key=None):
+        """Resize, filter, edge and tone stages shared by both glyph modes.
+
+        The edge filter is cached on its own so moving a tone slider only
+        reruns the lookup table pass (plus the mean for a brightness change).
+        Returns the adjusted image and the adjust stage key.
+        """
+        resize_key = _stage_key("resize", decode_key, self.output_width)
+        image = self._cached("resize", resize_key, lambda: self._resize_image(image, source_size))
+        logger.debug("Image resized. New size: %s", image.size)
+        
+        # One stage per filter, keyed on the stack prefix below it, so pushing
+        # or popping the top filter reuses everything underneath
+        filter_key = resize_key
+        for name in self.filters:
+            filter_key = _stage_key("filter", filter_key, name)
+            image = self._cached("filter", filter_key, lambda: self._apply_filter(image, name))
+        
+        if self.reference:
+            adjust_key = _stage_key("adjust", filter_key, self.brightness, self.contrast, self.invert,
+                                    self.gamma, self.reference)
+            return self._cached("adjust", adjust_key, lambda: self._adjust_image_reference(image)), adjust_key
+        
+        edge_key = _stage_key("edge", filter_key)
+        mean_key = _stage_key("tone_mean", edge_key, self.brightness)
+        adjust_key = _stage_key("adjust", edge_key, self.brightness, self.contrast, self.invert, self.gamma)
+        
+        edges = self._cached("edge", edge_key, lambda: self._enhance_edges(image))
+        # A contrast of 1 leaves every value alone, whatever the mean
+        mean = self._cached("tone_mean", mean_key, lambda: self._tone_mean(edges)) if self.contrast != 1 else 0
+        image = self._cached("adjust", adjust_key, lambda: self._apply_tone(edges, mean))
+        logger.debug("Image adjusted")
+        return image, adjust_key
+
+    def _prepare_shapes(self, image, source_size, decode_key=None):
+        """Shape mode counterpart of `_prepare`: resize to sub-cells, adjust, match glyphs.
+
+        Returns the glyph indices, the per-cell RGB colors and the match stage key.
+        """
+        image, adjust_key = self._resize_and_adjust(image, source_size, decode_key)
+        match_key = _stage_key("shape_match", adjust_key)
+        
+        glyph_indices, colors = self._cached("shape_match", match_key, lambda: self._match_shapes(image))
+        return glyph_indices, colors, match_key
+
+    def _match_shapes(self, image):
+        """Pick each cell's glyph by shape and average its sub-cells into the cell color."""
+        from glyph_matching import get_matcher
+        instrumentation.count("pixels_mapped", image.width * image.height)
+        # Dark pixels call for dense glyphs, as in the luminance ramp
+        glyph_indices = get_matcher(self.ascii_chars).match(np.asarray(image.convert("L")))
+        
+        # The image is an exact multiple of the grid, so BOX averages each cell's sub-cells
+        height, width = glyph_indices.shape
+        colors = np.asarray(image.resize((width, height), Image.BOX))
+        return glyph_indices, colors
+
+    def _shapes_to_text(self, glyph_indices, colors):
+        """Glyph mapping stage of shape mode: matched indices to the final text."""
+        if self.color_mode:
+            ascii_art = render_ansi(glyph_indices, self.ascii_chars, colors, self.color_mode)
+        else:
+            ascii_art = self._glyphs_to_text(glyph_indices)
+        self._record_render_stats(glyph_indices.size, len(ascii_art))
+        return ascii_art
+
+    def _convert_cells(self, source=None, with_colors=True):
+        """Convert the source to glyph indices and per-cell RGB colors instead of text.
+
+        The colors are None when ``with_colors`` is false.
+        """
+        image, source_size, decode_key = self._decode(source)
+        return self._cells(image, source_size, decode_key, with_colors)
+
+    def _cells(self, image, source_size, decode_key=None, with_colors=True):
+        """`_convert_cells` for an already decoded image."""
+        if self.glyph_mode == "shape":
+            glyph_indices, colors, _ = self._prepare_shapes(image, source_size, decode_key)
+            return glyph_indices, colors if with_colors else None
+        image, _, _ = self._prepare(image, source_size, decode_key)
+        return self._map_glyph_indices(image), np.asarray(image) if with_colors else None
+
+    def _source_key(self, source=None):
+        """Identify the source so edits on disk invalidate cached stages.
+
+        Encoded bytes are keyed by content; in-memory images and arrays by
+        identity, so they must not be modified while a shared cache is in use.
+        """
+        source = self.image_path if source is None else source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return ("bytes", hashlib.blake2b(source, digest_size=16).hexdigest())
+        if isinstance(source, (Image.Image, np.ndarray)):
+            return ("object", _Identity(source))
+        stat = os.stat(source)
+        return ("file", os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+
+    def _buffer(self, name, shape, dtype):
+        """Scratch array reused between conversions of the same shape."""
+        buffer = self._scratch.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._scratch[name] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def _cached(self, stage, key, compute):
+        """Look a stage result up in the shared cache, if there is one.
+
+        Only real computations are timed, under the stage's name.
+        """
+        if self.should_stop is not None and self.should_stop():
+            raise ConversionCancelled(stage)
+        
+        def timed_compute():
+            with instrumentation.span(stage):
+                return compute()
+        
+        if self.cache is None or key is None:
+            return timed_compute()
+        return self.cache.get_or_compute(key, timed_compute)
+
+    def _map_glyphs(self, image, intensity_map):
+        """Glyph mapping stage: turn the adjusted image into the final text."""
+        if self.color_mode:
+            glyph_indices = self._map_glyph_indices(image)
+            ascii_art = render_ansi(glyph_indices, self.ascii_chars, np.asarray(image), self.color_mode)
+        elif self.reference:
+            ascii_art = self._convert_pixels_reference(image, intensity_map)
+        else:
+            glyph_indices = self._map_glyph_indices(image)
+            ascii_art = self._glyphs_to_text(glyph_indices)
+        
+        self._record_render_stats(image.width * image.height, len(ascii_art))
+        return ascii_art
+
+    def _record_render_stats(self, cells, length):
+        """Remember the output size of the last glyph mapping."""
+        self.render_stats = {
+            "cells": cells,
+            "bytes": length,
+            "bytes_per_cell": length / cells if cells else 0.0,
+        }
+
+    def _map_glyph_indices(self, image):
+        """Pick the glyph index of every pixel, a band of rows at a time.
+
+        Array version of `_advanced_pixel_to_ascii`. The per-pixel path only
+        ever receives a scalar from the intensity map, so its detail blend
+        (which expects an array) never applies and the map is not needed
+        here; the output is identical all the same. Bands of
+        about ``GLYPH_CHUNK_CELLS`` cells keep the float64 scratch buffers
+        small for very wide output.
+        """
+        width, height = image.size
+        instrumentation.count("pixels_mapped", width * height)
+        glyph_indices = np.empty((height, width), dtype=np.uint8)
+        bands = self._tile_bands(height)
+        if bands is not None:
+            def map_tile(band):
+                # Each tile maps through its own copy so the scratch buffers are not shared
+                worker = copy.copy(self)
+                worker._scratch = {}
+                worker.threads = 1
+                glyph_indices[band[0]:band[1]] = worker._map_glyph_indices(
+                    image.crop((0, band[0], width, band[1])))
+            list(_thread_pool(self.threads).map(map_tile, bands))
+            return glyph_indices
+        
+        band_rows = max(1, GLYPH_CHUNK_CELLS // max(width, 1))
+        for top in range(0, height, band_rows):
+            bottom = min(height, top + band_rows)
+            pixels = np.asarray(image.crop((0, top, width, bottom)))
+            glyph_indices[top:bottom] = self._map_band(pixels, band_rows)
+        return glyph_indices
+
+    def _map_band(self, pixels, band_rows):
+        """Glyph indices of one (rows, width, 3) band of pixels.
+
+        Scratch buffers are sized for ``band_rows`` so a shorter last band reuses them.
+        """
+        r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+        rows, width = r.shape
+        
+        # Same float64 operations, in the same order, as the per-pixel path:
+        # (0.299 * r + 0.587 * g + 0.114 * b) / 255 * max_chars
+        luminance = self._buffer("luminance", (band_rows, width), np.float64)[:rows]
+        term = self._buffer("term", (band_rows, width), np.float64)[:rows]
+        np.multiply(r, 0.299, out=luminance)
+        luminance += np.multiply(g, 0.587, out=term)
+        luminance += np.multiply(b, 0.114, out=term)
+        luminance /= 255
+        max_chars = len(self.ascii_chars) - 1
+        luminance *= max_chars
+        
+        intensity_index = self._buffer("intensity_index", (band_rows, width), np.intp)[:rows]
+        np.copyto(intensity_index, luminance, casting='unsafe')
+        np.clip(intensity_index, 0, max_chars, out=intensity_index)
+        return intensity_index
+
+    def _glyphs_to_text(self, glyph_indices):
+        """Turn a 2-D array of glyph indices into newline-separated rows."""
+        height, width = glyph_indices.shape
+        text = self._buffer("text", (height, width + 1), np.uint8)
+        np.take(self._glyph_lookup, glyph_indices, out=text[:, :width])
+        text[:, width] = ord('\n')
+        return text.tobytes()[:-1].decode('ascii')
+
+    def _convert_pixels_reference(self, image, intensity_map):
+        """Per-pixel version of `_map_glyph_indices` followed by `_glyphs_to_text`."""
+        # Convert image to pixel data
+        pixels = list(image.getdata())
+        logger.debug("Total pixels: %s", len(pixels))
+        
+        # Convert pixels to ASCII
+        ascii_art = []
+        for i in range(image.height):
+            row = []
+            for j in range(image.width):
+                pixel_index = i * image.width + j
+                pixel = pixels[pixel_index]
+                
+                # Safely get local intensity
+                if intensity_map is not None:
+                    local_intensity = intensity_map[min(i, intensity_map.shape[0]-1), 
+                                                   min(j, intensity_map.shape[1]-1)]
+                else:
+                    local_intensity = None
+                
+                row.append(self._advanced_pixel_to_ascii(pixel, local_intensity))
+            ascii_art.append(''.join(row))
+        
+        return '\n'.join(ascii_art)
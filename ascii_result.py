@@ -0,0 +1,89 @@
+import numpy as np
+from ansi import iter_ansi
+
+# Rows turned into text per chunk when streaming
+DEFAULT_CHUNK_ROWS = 256
+
+class AsciiResult:
+    """Converted art held as one uint8 glyph index per cell.
+
+    Text is only produced on demand: ``str(result)`` builds (and keeps) the
+    whole string, while `write` and `iter_chunks` produce a few hundred rows
+    at a time, so writing huge art never holds more than one chunk of text.
+    Slicing (``result[10:20]``, ``result[:, :80]``) returns a result viewing
+    the same arrays. With a ``color_mode``, ``colors`` holds the RGB color of
+    every cell and the text carries ANSI escape sequences.
+    """
+
+    def __init__(self, glyph_indices, charset, colors=None, color_mode=None):
+        self.glyph_indices = glyph_indices
+        self.charset = charset
+        self.colors = colors
+        self.color_mode = color_mode
+        self._lookup = np.frombuffer(charset.encode("ascii"), dtype=np.uint8)
+        self._text = None
+
+    @property
+    def shape(self):
+        """(rows, columns) of cells."""
+        return self.glyph_indices.shape
+
+    @property
+    def nbytes(self):
+        """Memory held by the cell arrays (not counting a materialized string)."""
+        return self.glyph_indices.nbytes + (self.colors.nbytes if self.colors is not None else 0)
+
+    def __str__(self):
+        if self._text is None:
+            self._text = "".join(self.iter_chunks(chunk_rows=None))
+        return self._text
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return str(self) == other
+        if isinstance(other, AsciiResult):
+            return str(self) == str(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        # Integer indices keep their axis so the result stays two-dimensional
+        key = tuple(slice(index, index + 1 or None) if isinstance(index, int) else index for index in key)
+        return AsciiResult(self.glyph_indices[key], self.charset,
+                           None if self.colors is None else self.colors[key], self.color_mode)
+
+    def iter_chunks(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Yield the text in pieces of ``chunk_rows`` rows that join to ``str(result)``.
+
+        ``chunk_rows=None`` yields everything as one piece.
+        """
+        if self.color_mode:
+            yield from iter_ansi(self.glyph_indices, self.charset, self.colors, self.color_mode, chunk_rows)
+            return
+
+        height, width = self.glyph_indices.shape
+        step = chunk_rows or max(height, 1)
+        for top in range(0, height, step):
+            rows = self.glyph_indices[top:top + step]
+            # Each row plus its line break; the break after the very last row is dropped
+            text = np.empty((rows.shape[0], width + 1), dtype=np.uint8)
+            np.take(self._lookup, rows, out=text[:, :width])
+            text[:, width] = ord("\n")
+            data = text.tobytes()
+            yield data[:-1].decode("ascii") if top + step >= height else data.decode("ascii")
+
+    def iter_lines(self):
+        """Yield the rows of plain art one by one, without line breaks."""
+        for row in self.glyph_indices:
+            yield self._lookup[row].tobytes().decode("ascii")
+
+    def write(self, file, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Stream the text into a text-mode file object; returns the characters written."""
+        written = 0
+        for chunk in self.iter_chunks(chunk_rows):
+            file.write(chunk)
+            written += len(chunk)
+        return written
@@ -0,0 +1,153 @@
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ascii_converter import ASCIIConverter
+from utils import is_image_file
+
+# Converter set up once per worker process and reused for every file it handles
+_worker_converter = None
+
+def collect_inputs(specs, file_list=None):
+    """Expand directories, glob patterns and plain paths into (path, relative path) pairs.
+
+    The relative path is what gets mirrored under the output directory: files
+    found in a directory keep their position below it, glob matches keep their
+    position below the pattern's fixed prefix, and plain files keep their name.
+    With several specs each relative path also starts with the name of the
+    directory it was found under, so ``dirA/x.png`` and ``dirB/x.png`` stay apart.
+    """
+    specs = list(specs)
+    if file_list:
+        with open(file_list, "r") as file:
+            specs.extend(line.strip() for line in file if line.strip())
+
+    inputs = []
+    seen = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            matches = []
+            for dirpath, dirnames, filenames in os.walk(spec):
+                dirnames.sort()
+                matches.extend(os.path.join(dirpath, name) for name in sorted(filenames))
+            root = spec
+        elif glob.has_magic(spec):
+            matches = sorted(glob.glob(spec, recursive=True))
+            root = _glob_root(spec)
+        else:
+            # Plain paths are passed through so missing files are reported as failures
+            matches = [spec]
+            root = os.path.dirname(spec)
+        prefix = _root_name(root) if len(specs) > 1 else ""
+
+        for path in matches:
+            if path != spec and not is_image_file(path):
+                continue
+            key = os.path.abspath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            inputs.append((path, os.path.join(prefix, os.path.relpath(path, root or os.curdir))))
+    return inputs
+
+def _root_name(root):
+    """Name of the directory a spec expands below, or "" for the current directory."""
+    if not root:
+        return ""
+    return os.path.basename(os.path.abspath(root))
+
+def _glob_root(pattern):
+    """Return the directory part of a glob pattern that contains no wildcards."""
+    parts = []
+    for part in os.path.dirname(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts)
+
+def output_path(output_dir, relative_path):
+    """Where the art for an input with this relative path is written.
+
+    The source extension is kept (``x.png.txt``) so ``x.png`` and ``x.jpg`` do not collide.
+    """
+    return os.path.join(output_dir, relative_path + ".txt")
+
+def _init_worker(converter_params):
+    """Build the converter a worker process reuses for all of its files."""
+    global _worker_converter
+    _worker_converter = ASCIIConverter(None, **converter_params)
+
+def _convert_file(image_path, output_path):
+    """Convert one file in a worker; return an error message instead of raising."""
+    try:
+        os.makedirs(os.path.dirname(output_path) or os.curdir, exist_ok=True)
+        with open(output_path, "w") as file:
+            _worker_converter.write_ascii(file, image_path)
+        return None
+    except Exception as e:
+        # Do not leave a truncated output behind
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return f"{type(e).__name__}: {e}"
+
+def run_batch(inputs, output_dir, jobs=None, progress=None, **converter_params):
+    """Convert (path, relative path) pairs over a process pool.
+
+    Each result is written to ``output_dir`` as the relative path with
+    ``.txt`` appended. Failures are collected rather than raised so one bad
+    image does not stop the run. An input whose output path is still taken
+    by an earlier one (two specs naming different directories called
+    ``photos``) fails instead of overwriting it. ``progress`` is called as
+    ``progress(done, total, image_path, error)`` after every file.
+
+    Returns a summary dict with the converted count, the list of
+    ``(image_path, error)`` failures, elapsed seconds and images per second.
+    """
+    started = time.perf_counter()
+    failures = []
+    done = 0
+    jobs_by_output = {}
+    for image_path, relative_path in inputs:
+        path = output_path(output_dir, relative_path)
+        # normcase so names differing only in case collide on case-insensitive file systems
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in jobs_by_output:
+            jobs_by_output[key] = (image_path, path)
+        else:
+            error = f"output {path} is already written for {jobs_by_output[key][0]}"
+            failures.append((image_path, error))
+            done += 1
+            if progress:
+                progress(done, len(inputs), image_path, error)
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(converter_params,)) as executor:
+        futures = {}
+        for image_path, path in jobs_by_output.values():
+            futures[executor.submit(_convert_file, image_path, path)] = image_path
+
+        for future in as_completed(futures):
+            image_path = futures[future]
+            try:
+                error = future.result()
+            except Exception as e:  # e.g. a worker process died
+                error = f"{type(e).__name__}: {e}"
+            if error is not None:
+                failures.append((image_path, error))
+            done += 1
+            if progress:
+                progress(done, len(inputs), image_path, error)
+
+    seconds = time.perf_counter() - started
+    return {
+        "converted": done - len(failures),
+        "failed": failures,
+        "seconds": seconds,
+        "images_per_second": done / seconds if seconds > 0 else 0.0,
+    }
+
+def print_progress(done, total, image_path, error):
+    """Default progress reporter writing one line per file to stderr."""
+    status = f"FAILED ({error})" if error else "ok"
+    print(f"[{done}/{total}] {image_path}: {status}", file=sys.stderr)
@@ -0,0 +1,59 @@
+"""Throughput of shape-matched glyphs against the luminance ramp.
+
+Converts the same synthetic image in both glyph modes at several output
+widths and reports cells per second, plus the cost of building the glyph
+feature matrix versus loading it from the on-disk cache:
+
+    python benchmarks/bench_glyph_modes.py
+    python benchmarks/bench_glyph_modes.py --widths 80 300 1000 --repeats 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stages import make_image
+from ascii_converter import ASCIIConverter
+from glyph_matching import SHAPE_CHARSET, glyph_features, load_glyph_features
+
+def best_time(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare luminance and shape glyph modes.")
+    parser.add_argument("--widths", type=int, nargs="+", default=[80, 300, 1000],
+                        help="Output widths to time (default: 80 300 1000)")
+    parser.add_argument("--input-size", type=int, nargs=2, default=[1920, 1080], metavar=("W", "H"),
+                        help="Synthetic input size (default: 1920 1080)")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of this many runs (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        glyph_features(SHAPE_CHARSET)
+        computed = time.perf_counter() - started
+        load_glyph_features(cache_dir=directory)
+        loaded = best_time(lambda: load_glyph_features(cache_dir=directory), args.repeats)
+        print(f"glyph feature matrix: computed in {computed * 1000:.1f} ms, "
+              f"loaded from disk in {loaded * 1000:.2f} ms")
+
+        image_path = make_image(tuple(args.input_size), os.path.join(directory, "input.jpg"))
+        print(f"{'width':>6} {'mode':>10} {'seconds':>9} {'cells/s':>12}")
+        for width in args.widths:
+            for mode in ("luminance", "shape"):
+                converter = ASCIIConverter(image_path, output_width=width, glyph_mode=mode)
+                converter.convert_to_ascii()  # warm-up, including the matcher
+                seconds = best_time(converter.convert_to_ascii, args.repeats)
+                cells = converter.render_stats["cells"]
+                print(f"{width:>6} {mode:>10} {seconds:>9.4f} {cells / seconds:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
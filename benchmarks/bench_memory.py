@@ -0,0 +1,72 @@
+"""Peak memory of a wide conversion, built as one string versus streamed.
+
+Each mode runs in a fresh interpreter so the peak resident set sizes do not
+mix; the traced peak covers NumPy and Python allocations (Pillow's own image
+buffers are only visible in the resident set):
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --width 8000 --input-size 8000 6000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+def measure(image_path, width, mode):
+    """Convert once in this process and return its peak memory figures."""
+    import resource
+    import time
+    import tracemalloc
+    from ascii_converter import ASCIIConverter
+
+    converter = ASCIIConverter(image_path, output_width=width)
+    tracemalloc.start()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as file:
+        if mode == "string":
+            file.write(converter.convert_to_ascii())
+        else:
+            converter.write_ascii(file)
+    seconds = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {"seconds": seconds, "traced_peak": traced_peak,
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of string and streamed output.")
+    parser.add_argument("--width", type=int, default=4000, help="Output width (default: 4000)")
+    parser.add_argument("--input-size", type=int, nargs=2, default=[4000, 3000], metavar=("W", "H"),
+                        help="Synthetic input size (default: 4000 3000)")
+    parser.add_argument("--measure", nargs=2, metavar=("IMAGE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], args.width, args.measure[1])))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Linux carries the peak RSS across exec, so the large synthetic image is
+        # made in a throwaway process rather than in this parent
+        image_path = os.path.join(directory, "input.jpg")
+        subprocess.run([sys.executable, "-c", "import sys; from bench_stages import make_image; "
+                        "make_image((int(sys.argv[1]), int(sys.argv[2])), sys.argv[3])",
+                        str(args.input_size[0]), str(args.input_size[1]), image_path],
+                       check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        print(f"{'mode':>8} {'seconds':>8} {'traced peak MiB':>16} {'max RSS MiB':>12}")
+        for mode in ("string", "stream"):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--width", str(args.width),
+                                     "--measure", image_path, mode],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output)
+            print(f"{mode:>8} {result['seconds']:>8.2f} {result['traced_peak'] / 2**20:>16.1f} "
+                  f"{result['max_rss'] / 2**20:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time saved by rendering several widths from one decode.
+
+Converts the same synthetic images once per width with separate converters
+and once with `ASCIIConverter.convert_widths`, and reports both times, the
+saving and the share of cells that differ from the separate renditions:
+
+    python benchmarks/bench_pyramid.py
+    python benchmarks/bench_pyramid.py --widths 40 80 160 320 640 --format png
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stages import make_image
+from ascii_converter import ASCIIConverter
+
+def best_time(function, repeats):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare separate conversions with one pyramid conversion.")
+    parser.add_argument("--widths", type=int, nargs="+", default=[40, 80, 160, 320],
+                        help="Rendition widths (default: 40 80 160 320)")
+    parser.add_argument("--input-sizes", type=int, nargs="+", default=[1920, 1080, 4000, 3000],
+                        metavar="W H", help="Synthetic input sizes as W H pairs (default: 1920 1080 4000 3000)")
+    parser.add_argument("--format", choices=["jpg", "png"], default="jpg", help="Input format (default: jpg)")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of this many runs (default: 3)")
+    args = parser.parse_args()
+
+    sizes = list(zip(args.input_sizes[::2], args.input_sizes[1::2]))
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'input':>10} {'separate s':>11} {'pyramid s':>10} {'saved':>7} {'cells differing':>16}")
+        for size in sizes:
+            image_path = make_image(size, os.path.join(directory, f"input.{args.format}"))
+            separate, expected = best_time(
+                lambda: {width: ASCIIConverter(image_path, output_width=width).convert() for width in args.widths},
+                args.repeats)
+            pyramid, renditions = best_time(lambda: ASCIIConverter(image_path).convert_widths(args.widths),
+                                            args.repeats)
+            cells = sum(renditions[width].glyph_indices.size for width in args.widths)
+            differing = sum(int((renditions[width].glyph_indices != expected[width].glyph_indices).sum())
+                            for width in args.widths)
+            print(f"{size[0]:>5}x{size[1]:<4} {separate:>11.3f} {pyramid:>10.3f} "
+                  f"{1 - pyramid / separate:>7.0%} {differing / cells:>16.2%}")
+
+if __name__ == "__main__":
+    main()
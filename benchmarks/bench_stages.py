@@ -0,0 +1,160 @@
+"""Per-stage timings of ASCIIConverter across input sizes and settings.
+
+Synthetic images are generated on the fly, so no assets are needed:
+
+    python benchmarks/bench_stages.py --output results.json
+    python benchmarks/bench_stages.py --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmarks/bench_stages.py --update-baseline benchmarks/baseline.json
+
+With --baseline the run exits with status 1 when any stage is slower than
+its baseline by more than the threshold (and by more than the noise floor).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import PIL
+from PIL import Image
+from ascii_converter import ASCIIConverter
+
+STAGES = ("open", "resize", "adjust", "intensity_map", "glyph_map")
+
+MATRIX = {
+    "input_size": [(640, 480), (1920, 1080), (4000, 3000)],
+    "output_width": [80, 300, 1000],
+    "density": ["coarse", "fine"],
+    "detail_preservation": [0.3, 0.9],
+}
+
+# Subset of MATRIX, so quick runs can be checked against a full baseline
+QUICK_MATRIX = {
+    "input_size": [(640, 480), (1920, 1080)],
+    "output_width": [80, 300],
+    "density": ["coarse"],
+    "detail_preservation": [0.3],
+}
+
+# Differences below this many seconds are treated as timer noise
+NOISE_FLOOR = 0.002
+
+def make_image(size, path):
+    """Write a deterministic synthetic photo-like image: gradients, shapes and noise."""
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    rng = np.random.default_rng(width * 7919 + height)
+    red = 127 + 127 * np.sin(x / width * 6.0)
+    green = 255 * y / height
+    blue = np.where((x - width / 2) ** 2 + (y - height / 2) ** 2 < (min(size) / 3) ** 2, 220, 40)
+    pixels = np.stack([red, green, blue], axis=-1) + rng.normal(0, 12, (height, width, 3))
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, quality=90)
+    return path
+
+def time_stages(image_path, repeats, **params):
+    """Return the best-of-``repeats`` seconds spent in each stage."""
+    converter = ASCIIConverter(image_path, **params)
+    best = dict.fromkeys(STAGES, float("inf"))
+    for _ in range(repeats):
+        timings = {}
+        started = time.perf_counter()
+        image, source_size = converter._open_image()
+        timings["open"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        image = converter._resize_image(image, source_size)
+        timings["resize"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        image = converter._adjust_image(image)
+        timings["adjust"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # Only the per-pixel reference mapping reads the intensity map
+        intensity_map = converter._create_intensity_map(image) if converter.reference else None
+        timings["intensity_map"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        converter._map_glyphs(image, intensity_map)
+        timings["glyph_map"] = time.perf_counter() - started
+
+        for stage, seconds in timings.items():
+            best[stage] = min(best[stage], seconds)
+    return best
+
+def case_name(input_size, output_width, density, detail_preservation):
+    return f"{input_size[0]}x{input_size[1]}/w{output_width}/{density}/d{detail_preservation}"
+
+def run(matrix, repeats):
+    """Time every combination in the matrix and return a JSON-ready dict."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        images = {size: make_image(size, os.path.join(workdir, f"{size[0]}x{size[1]}.jpg"))
+                  for size in matrix["input_size"]}
+        for input_size, output_width, density, detail in itertools.product(
+                matrix["input_size"], matrix["output_width"], matrix["density"],
+                matrix["detail_preservation"]):
+            name = case_name(input_size, output_width, density, detail)
+            results[name] = time_stages(images[input_size], repeats, output_width=output_width,
+                                        density=density, detail_preservation=detail)
+            total = sum(results[name].values())
+            print(f"{name:40s} {total * 1000:8.1f} ms", file=sys.stderr)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+        },
+        "repeats": repeats,
+        "results": results,
+    }
+
+def compare(current, baseline, threshold):
+    """Return a list of (case, stage, baseline seconds, current seconds) regressions."""
+    regressions = []
+    for name, stages in current["results"].items():
+        for stage, seconds in stages.items():
+            reference = baseline.get("results", {}).get(name, {}).get(stage)
+            if reference is None:
+                continue
+            if seconds > reference * (1 + threshold) and seconds - reference > NOISE_FLOOR:
+                regressions.append((name, stage, reference, seconds))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ASCIIConverter stages.")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a stored results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown relative to the baseline (default: 0.25)")
+    parser.add_argument("--update-baseline", metavar="PATH", help="Store these results as the new baseline")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case; the best is kept (default: 3)")
+    parser.add_argument("--quick", action="store_true", help="Use a small matrix")
+    args = parser.parse_args()
+
+    current = run(QUICK_MATRIX if args.quick else MATRIX, args.repeats)
+
+    for path in filter(None, (args.output, args.update_baseline)):
+        with open(path, "w") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        for name, stage, reference, seconds in regressions:
+            print(f"REGRESSION {name} {stage}: {reference * 1000:.2f} ms -> {seconds * 1000:.2f} ms",
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than baseline by more than {args.threshold:.0%}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
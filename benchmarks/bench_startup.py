@@ -0,0 +1,103 @@
+"""Start-up cost of a command-line conversion, tracked against a budget.
+
+Measures, over several fresh interpreter launches of ``main.py`` on a small
+synthetic image, the time to the first byte of output and to process exit:
+
+    python benchmarks/bench_startup.py --baseline benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --update-baseline benchmarks/startup_baseline.json
+
+Exits with status 1 when the median time to first byte exceeds --budget-ms,
+or the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a CLI conversion must never load
+FORBIDDEN_MODULES = ("PyQt5", "gui")
+
+def make_small_image(path):
+    """Write a tiny PNG without importing Pillow into this process."""
+    code = ("import numpy as np; from PIL import Image; "
+            f"Image.fromarray(np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)).save({path!r})")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def measure_once(image_path):
+    """Launch one CLI conversion; return (seconds to first byte, seconds to exit)."""
+    started = time.perf_counter()
+    # --no-cache so every launch really converts
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "main.py"), image_path, "-w", "40",
+                                "--no-cache"], stdout=subprocess.PIPE, cwd=REPO_ROOT)
+    process.stdout.read(1)
+    first_byte = time.perf_counter() - started
+    process.stdout.read()
+    if process.wait() != 0:
+        raise RuntimeError("CLI conversion failed")
+    return first_byte, time.perf_counter() - started
+
+def loaded_modules(image_path):
+    """Top-level modules imported by a CLI conversion."""
+    code = ("import runpy, sys; "
+            f"sys.argv = ['main.py', {image_path!r}, '-w', '40', '--no-cache']; "
+            "runpy.run_path('main.py', run_name='__main__'); "
+            "sys.stderr.write(' '.join(sorted({name.split('.')[0] for name in sys.modules})))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return result.stderr.split()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI start-up time.")
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter launches (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=500.0,
+                        help="Maximum median time to first byte (default: 500)")
+    parser.add_argument("--baseline", help="Compare against a stored results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown relative to the baseline (default: 0.25)")
+    parser.add_argument("--update-baseline", metavar="PATH", help="Store these results as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = os.path.join(workdir, "small.png")
+        make_small_image(image_path)
+        measure_once(image_path)  # warm the OS file cache
+        samples = [measure_once(image_path) for _ in range(args.runs)]
+        modules = loaded_modules(image_path)
+
+    result = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "first_byte_ms": statistics.median(first for first, _ in samples) * 1000,
+        "exit_ms": statistics.median(total for _, total in samples) * 1000,
+    }
+    print(f"median time to first byte {result['first_byte_ms']:.1f} ms, "
+          f"to exit {result['exit_ms']:.1f} ms over {args.runs} runs", file=sys.stderr)
+
+    if args.update_baseline:
+        with open(args.update_baseline, "w") as file:
+            json.dump(result, file, indent=2, sort_keys=True)
+
+    failures = [f"CLI run imported {name}" for name in FORBIDDEN_MODULES if name in modules]
+    if result["first_byte_ms"] > args.budget_ms:
+        failures.append(f"time to first byte {result['first_byte_ms']:.1f} ms exceeds "
+                        f"budget {args.budget_ms:.0f} ms")
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        limit = baseline["first_byte_ms"] * (1 + args.threshold)
+        if result["first_byte_ms"] > limit:
+            failures.append(f"time to first byte {result['first_byte_ms']:.1f} ms exceeds baseline "
+                            f"{baseline['first_byte_ms']:.1f} ms by more than {args.threshold:.0%}")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
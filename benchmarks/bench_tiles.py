@@ -0,0 +1,56 @@
+"""Speed-up of tiled, multi-threaded conversion by thread count.
+
+Converts one synthetic image at poster widths with ``threads`` set to each
+count in turn, checks the text is identical to the single-threaded run and
+prints the time and speed-up of every combination:
+
+    python benchmarks/bench_tiles.py
+    python benchmarks/bench_tiles.py --widths 2000 8000 --threads 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stages import make_image
+from ascii_converter import ASCIIConverter
+
+def best_time(function, repeats):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Time tiled conversion over different thread counts.")
+    parser.add_argument("--widths", type=int, nargs="+", default=[2000, 4000, 8000],
+                        help="Output widths (default: 2000 4000 8000)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Thread counts (default: 1 2 4 8)")
+    parser.add_argument("--input-size", type=int, nargs=2, default=[4000, 3000], metavar=("W", "H"),
+                        help="Synthetic input size (default: 4000 3000)")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of this many runs (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as directory:
+        image_path = make_image(tuple(args.input_size), os.path.join(directory, "input.jpg"))
+        print(f"{'width':>6} {'threads':>8} {'seconds':>9} {'speed-up':>9}")
+        for width in args.widths:
+            baseline, expected = None, None
+            for threads in args.threads:
+                converter = ASCIIConverter(image_path, output_width=width, threads=threads)
+                seconds, result = best_time(lambda: str(converter.convert()), args.repeats)
+                if expected is None:
+                    baseline, expected = seconds, result
+                elif result != expected:
+                    raise SystemExit(f"output at {threads} threads differs from {args.threads[0]} thread(s)")
+                print(f"{width:>6} {threads:>8} {seconds:>9.3f} {baseline / seconds:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
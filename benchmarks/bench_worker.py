@@ -0,0 +1,84 @@
+"""Jobs per second of one long-lived worker against one CLI process per image.
+
+Writes a set of synthetic images, converts them once by launching
+``cli.py`` for every image (up to ``--jobs`` at a time) and once by piping
+NDJSON jobs through a single ``cli.py --worker`` with a pool of ``--jobs``
+processes, then prints the throughput of both and the worker's per-job
+timings:
+
+    python benchmarks/bench_worker.py
+    python benchmarks/bench_worker.py --images 200 --jobs 4 --width 120
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_stages import make_image
+
+def run_processes(image_paths, width, jobs):
+    """Convert every image with its own CLI process; returns the elapsed seconds."""
+    def convert(image_path):
+        subprocess.run([sys.executable, "cli.py", image_path, "-w", str(width), "--no-cache"],
+                       cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(jobs) as pool:
+        list(pool.map(convert, image_paths))
+    return time.perf_counter() - started
+
+def run_worker(image_paths, width, jobs):
+    """Convert every image through one worker process; returns the elapsed seconds and the responses."""
+    started = time.perf_counter()
+    worker = subprocess.Popen([sys.executable, "cli.py", "--worker", "--jobs", str(jobs), "--no-cache"],
+                              cwd=REPO_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    jobs_text = "".join(json.dumps({"id": index, "path": image_path, "params": {"output_width": width}}) + "\n"
+                        for index, image_path in enumerate(image_paths))
+    output, _ = worker.communicate(jobs_text)
+    seconds = time.perf_counter() - started
+    return seconds, [json.loads(line) for line in output.splitlines()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the NDJSON worker with one process per image.")
+    parser.add_argument("--images", type=int, default=100, help="Number of images (default: 100)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Concurrent processes / worker pool size (default: CPU count)")
+    parser.add_argument("--width", type=int, default=100, help="Output width (default: 100)")
+    parser.add_argument("--input-size", type=int, nargs=2, default=[640, 480], metavar=("W", "H"),
+                        help="Synthetic input size (default: 640 480)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Distinct sizes so no two images are byte-identical
+        image_paths = [make_image((args.input_size[0] + index, args.input_size[1]),
+                                  os.path.join(directory, f"image_{index}.jpg"))
+                       for index in range(args.images)]
+
+        process_seconds = run_processes(image_paths, args.width, args.jobs)
+        worker_seconds, responses = run_worker(image_paths, args.width, args.jobs)
+
+    failed = [response for response in responses if not response["ok"]]
+    if len(responses) != len(image_paths) or failed:
+        raise SystemExit(f"worker answered {len(responses)} jobs, {len(failed)} failed")
+    in_order = sum(response["id"] == index for index, response in enumerate(responses))
+    convert_ms = [response["timing"]["convert_ms"] for response in responses]
+    total_ms = [response["timing"]["total_ms"] for response in responses]
+
+    print(f"{args.images} images, {args.jobs} processes, width {args.width}")
+    print(f"  process per image: {process_seconds:6.2f}s  {args.images / process_seconds:7.1f} jobs/s")
+    print(f"  worker:            {worker_seconds:6.2f}s  {args.images / worker_seconds:7.1f} jobs/s "
+          f"({process_seconds / worker_seconds:.1f}x)")
+    print(f"  worker per job: convert median {statistics.median(convert_ms):.1f} ms, "
+          f"total median {statistics.median(total_ms):.1f} ms; "
+          f"{len(responses) - in_order} of {len(responses)} answered out of submission order")
+
+if __name__ == "__main__":
+    main()
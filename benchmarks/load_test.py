@@ -0,0 +1,151 @@
+"""Load test for the local HTTP conversion service.
+
+Starts ``cli.py --serve`` (unless --url points at a running service), then
+fires requests from many concurrent clients. A share of the requests reuse
+the same image so request coalescing is exercised:
+
+    python benchmarks/load_test.py --requests 500 --concurrency 32
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --duplicates 0.5
+
+Reports throughput, latency percentiles, status counts and the service's
+own /metrics.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+from PIL import Image
+
+def make_images(count, size=(640, 480)):
+    """Encode ``count`` distinct synthetic JPEGs."""
+    rng = np.random.default_rng(1)
+    images = []
+    for _ in range(count):
+        pixels = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).resize(size, Image.BILINEAR).save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+async def request(host, port, method, path, body=b""):
+    """Send one HTTP request; return (status, body bytes)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split(b" ", 2)[1])
+    length = 0
+    while True:
+        line = (await reader.readline()).strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    payload = await reader.readexactly(length)
+    writer.close()
+    return status, payload
+
+async def run_load(host, port, images, total, concurrency, duplicates, width):
+    """Run ``total`` conversions from ``concurrency`` clients; return per-request results."""
+    queue = asyncio.Queue()
+    for index in range(total):
+        # Duplicates all hit the first image; the rest cycle through the others
+        if random.random() < duplicates or len(images) == 1:
+            queue.put_nowait(images[0])
+        else:
+            queue.put_nowait(images[1 + index % (len(images) - 1)])
+    results = []
+
+    async def client():
+        while not queue.empty():
+            body = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                status, _ = await request(host, port, "POST", f"/convert?width={width}", body)
+            except OSError:
+                status = 0
+            results.append((status, time.perf_counter() - started))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results
+
+def wait_for_service(host, port, timeout=15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            status, _ = asyncio.run(request(host, port, "GET", "/health"))
+            if status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("service did not start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the conversion service.")
+    parser.add_argument("--url", help="Use a running service instead of starting one")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the spawned service (default: 8766)")
+    parser.add_argument("--jobs", type=int, help="Worker processes of the spawned service")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--images", type=int, default=20, help="Distinct images (default: 20)")
+    parser.add_argument("--duplicates", type=float, default=0.3,
+                        help="Share of requests for the same image (default: 0.3)")
+    parser.add_argument("--width", type=int, default=120, help="Output width (default: 120)")
+    args = parser.parse_args()
+
+    service = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        host, port = "127.0.0.1", args.port
+        command = [sys.executable, os.path.join(REPO_ROOT, "cli.py"), "--serve", "--port", str(port)]
+        if args.jobs:
+            command += ["--jobs", str(args.jobs)]
+        service = subprocess.Popen(command, cwd=REPO_ROOT)
+    try:
+        wait_for_service(host, port)
+        images = make_images(args.images)
+        started = time.perf_counter()
+        results = asyncio.run(run_load(host, port, images, args.requests, args.concurrency,
+                                       args.duplicates, args.width))
+        seconds = time.perf_counter() - started
+        _, metrics = asyncio.run(request(host, port, "GET", "/metrics"))
+    finally:
+        if service:
+            # SIGTERM lets the service shut its worker pool down before exiting
+            service.terminate()
+            try:
+                service.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                service.kill()
+                service.wait()
+
+    latencies = sorted(latency for status, latency in results if status == 200)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"{len(results)} requests in {seconds:.2f}s ({len(results) / seconds:.1f} req/s), "
+          f"statuses {statuses}")
+    if latencies:
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        print(f"latency ms: p50 {quantiles[49] * 1000:.1f}  p95 {quantiles[94] * 1000:.1f}  "
+              f"p99 {quantiles[98] * 1000:.1f}  max {latencies[-1] * 1000:.1f}")
+    print("service metrics:", json.dumps(json.loads(metrics), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,273 @@
 import argparse
-from ascii_converter import ASCIIConverter
+import logging
+import os
+import sys
+import instrumentation
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
 
 def main():
     parser = argparse.ArgumentParser(description="Convert images to ASCII art.")
-    parser.add_argument("image_path", help="Path to the input image")
+    parser.add_argument("image_path", nargs="*",
+                        help="Path to the input image (with --batch: images, directories or glob patterns)")
     parser.add_argument("--output", "-o", help="Output file path (default: print to console)")
     parser.add_argument("--width", "-w", type=int, default=100, help="Output width (default: 100)")
+    parser.add_argument("--widths", type=int, nargs="+", metavar="WIDTH",
+                        help="Write one rendition per width into --output-dir, all from a single decode")
     parser.add_argument("--density", "-d", choices=["fine", "medium", "coarse"], default="medium", help="Density of ASCII art")
+    parser.add_argument("--glyph-mode", choices=["luminance", "shape"], default="luminance",
+                        help="Pick characters by cell brightness, or by matching glyph shapes (default: luminance)")
+    parser.add_argument("--color", "-c", choices=["truecolor", "256", "16"],
+                        help="Emit ANSI colored output (24-bit, 256-color or 16-color)")
+    parser.add_argument("--filter", dest="filters", action="append", default=[], metavar="NAME",
+                        help="Apply a filter (blur, smooth, sharpen, detail, edge_enhance, find_edges, contour, "
+                             "emboss, median) to the resized image; repeat to stack them in order")
+    parser.add_argument("--threads", type=positive_int, default=1,
+                        help="Split the stages of large conversions over this many threads (default: 1)")
+    parser.add_argument("--image", help="Render the art to a PNG/JPG bitmap instead of text")
+    parser.add_argument("--stats", action="store_true", help="Print decode and output size statistics to stderr")
+    parser.add_argument("--batch", action="store_true", help="Convert many images over a process pool")
+    parser.add_argument("--frames", action="store_true",
+                        help="Convert every frame of an animation, frame directory or glob into --output-dir")
+    parser.add_argument("--play", action="store_true", help="Play an animation or frame sequence in the terminal")
+    parser.add_argument("--fps", type=float, default=10.0, help="Playback frame rate for --play (default: 10)")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP conversion service on localhost")
+    parser.add_argument("--worker", action="store_true",
+                        help="Read NDJSON jobs from stdin and write results to stdout until end of input")
+    parser.add_argument("--port", type=int, default=8765, help="Service mode: port to listen on (default: 8765)")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="Service mode: pending conversions before requests get 503; "
+                             "worker mode: jobs in flight before reading pauses (default: 64)")
+    parser.add_argument("--output-dir", help="Batch/frames mode: directory receiving the .txt files")
+    parser.add_argument("--file-list", help="Batch mode: file with one input path per line")
+    parser.add_argument("--jobs", "-j", type=int, help="Batch/service/worker mode: worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk result cache")
+    parser.add_argument("--cache-dir", help="Result cache directory (default: $ARTASCII_CACHE_DIR or ~/.cache/artascii-studio)")
+    parser.add_argument("--cache-size", type=int, default=256, help="Result cache size limit in MiB (default: 256)")
+    parser.add_argument("--trace", metavar="PATH", help="Record per-stage timings and counters to this file")
+    parser.add_argument("--trace-format", choices=["json", "chrome"], default="json",
+                        help="Summary JSON with all spans, or Chrome trace events (default: json)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Write debug logging to stderr")
     args = parser.parse_args()
 
-    converter = ASCIIConverter(args.image_path, output_width=args.width, density=args.density)
-    ascii_art = converter.convert_to_ascii()
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.trace:
+        run(parser, args)
+        return
+
+    instrumentation.enable()
+    try:
+        run(parser, args)
+    finally:
+        if args.trace_format == "chrome":
+            instrumentation.export_trace(args.trace)
+        else:
+            instrumentation.export_json(args.trace)
+
+def run(parser, args):
+    """Dispatch to the conversion mode selected on the command line."""
+    if args.serve:
+        run_service_mode(args)
+        return
+
+    if args.worker:
+        run_worker_mode(args)
+        return
+
+    if args.filters:
+        from filter_stack import FILTERS
+        unknown = [name for name in args.filters if name not in FILTERS]
+        if unknown:
+            parser.error(f"unknown filter {unknown[0]!r} (choose from {', '.join(FILTERS)})")
+
+    if args.batch:
+        run_batch_mode(parser, args)
+        return
+
+    if len(args.image_path) != 1:
+        parser.error("exactly one image_path is required (use --batch for several)")
+
+    if args.frames or args.play:
+        run_frames_mode(parser, args)
+        return
+
+    if args.image:
+        run_image_mode(args)
+        return
+
+    if args.widths:
+        run_widths_mode(parser, args)
+        return
+
+    # Imported here so --help and argument errors do not load NumPy and Pillow
+    from ascii_converter import ASCIIConverter
+
+    result_cache = make_result_cache(args)
+    converter = ASCIIConverter(args.image_path[0], output_width=args.width, density=args.density,
+                               color=args.color, glyph_mode=args.glyph_mode, result_cache=result_cache,
+                               threads=args.threads, filters=args.filters)
+    # Streamed in chunks of rows, so huge art is never held as one string
+    try:
+        if args.output:
+            with open(args.output, "w") as file:
+                converter.write_ascii(file)
+        else:
+            converter.write_ascii(sys.stdout)
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. ``| head``); point stdout at devnull so the
+        # flush at interpreter exit does not fail again, and leave quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error converting image: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.stats and result_cache is not None:
+        stats = result_cache.stats()
+        print(f"Result cache {'hit' if stats['hits'] else 'miss'}; {stats['entries']} entries, "
+              f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f} MiB", file=sys.stderr)
+    if args.stats and converter.decode_stats:
+        print_decode_stats(converter.decode_stats)
+    if args.stats and converter.render_stats:
+        stats = converter.render_stats
+        print(f"Output {stats['bytes']} bytes for {stats['cells']} cells "
+              f"({stats['bytes_per_cell']:.2f} bytes/cell)", file=sys.stderr)
+
+def make_result_cache(args):
+    """The on-disk result cache selected by the command line, or None with --no-cache."""
+    if args.no_cache:
+        return None
+    from result_cache import ResultCache
+    return ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+
+def run_image_mode(args):
+    """Render the art to a bitmap sized to the cells, colored when --color is given."""
+    from ascii_converter import ASCIIConverter
+    from rasterizer import get_atlas, rasterize
 
-    if args.output:
-        with open(args.output, "w") as file:
-            file.write(ascii_art)
+    converter = ASCIIConverter(args.image_path[0], output_width=args.width, density=args.density,
+                               color=args.color, glyph_mode=args.glyph_mode, threads=args.threads,
+                               filters=args.filters)
+    try:
+        # In color mode the result also holds each cell's RGB color
+        result = converter.convert()
+        atlas = get_atlas(converter.ascii_chars)
+        if args.color:
+            image = rasterize(result.glyph_indices, atlas, colors=result.colors, background=(0, 0, 0))
+        else:
+            image = rasterize(result.glyph_indices, atlas)
+        image.save(args.image)
+    except Exception as e:
+        print(f"Error converting image: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def run_widths_mode(parser, args):
+    """Write the image at every --widths width as <name>_<width>.txt, decoding it once."""
+    from ascii_converter import ASCIIConverter
+
+    if not args.output_dir:
+        parser.error("--widths requires --output-dir")
+    converter = ASCIIConverter(args.image_path[0], density=args.density, color=args.color,
+                               glyph_mode=args.glyph_mode, threads=args.threads, filters=args.filters)
+    try:
+        renditions = converter.convert_widths(args.widths)
+    except Exception as e:
+        print(f"Error converting image: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(args.image_path[0]))[0]
+    for width, result in renditions.items():
+        with open(os.path.join(args.output_dir, f"{name}_{width}.txt"), "w") as file:
+            result.write(file)
+
+    if args.stats:
+        stats = converter.pyramid_stats
+        print(f"Rendered {len(renditions)} widths in {stats['seconds'] * 1000:.1f} ms, "
+              f"sharing one {stats['decode_seconds'] * 1000:.1f} ms decode", file=sys.stderr)
+        for level in stats["levels"]:
+            print(f"  {level['width']:>5} columns from {level['level_size'][0]}x{level['level_size'][1]} "
+                  f"in {level['seconds'] * 1000:.1f} ms", file=sys.stderr)
+        print_decode_stats(converter.decode_stats)
+
+def print_decode_stats(stats):
+    """Report how much of the source the decoder actually produced."""
+    source_width, source_height = stats["source_size"]
+    decoded_width, decoded_height = stats["decoded_size"]
+    print(f"Decoded {source_width}x{source_height} source as {decoded_width}x{decoded_height} "
+          f"({stats['method']}) in {stats['seconds'] * 1000:.1f} ms; "
+          f"peak pixel buffer {stats['decoded_bytes'] / 2**20:.1f} MiB "
+          f"vs {stats['full_decode_bytes'] / 2**20:.1f} MiB for a full decode", file=sys.stderr)
+
+def run_frames_mode(parser, args):
+    """Stream the frames of an animation to files or to the terminal."""
+    from ascii_converter import ASCIIConverter
+    from frames import play_frames, write_frames
+
+    converter = ASCIIConverter(None, output_width=args.width, density=args.density, color=args.color,
+                               glyph_mode=args.glyph_mode, threads=args.threads, filters=args.filters)
+    if args.play:
+        summary = play_frames(args.image_path[0], converter, fps=args.fps)
+        print(f"Played {summary['shown']}/{summary['frames']} frames, "
+              f"dropped {summary['dropped']} to hold {args.fps:g} fps", file=sys.stderr)
     else:
-        print(ascii_art)
+        if not args.output_dir:
+            parser.error("--frames requires --output-dir")
+        summary = write_frames(args.image_path[0], converter, args.output_dir)
+        print(f"Converted {summary['frames']} frames in {summary['seconds']:.2f}s "
+              f"({summary['fps']:.1f} frames/s)", file=sys.stderr)
+
+def run_service_mode(args):
+    """Serve conversions over HTTP on localhost until interrupted."""
+    import asyncio
+    from server import serve
+
+    try:
+        asyncio.run(serve(port=args.port, workers=args.jobs, max_queue=args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+def run_worker_mode(args):
+    """Convert NDJSON jobs from stdin over a process pool, answering on stdout as they finish."""
+    from worker import run_worker
+
+    worker = run_worker(workers=args.jobs, max_pending=args.max_queue, result_cache=make_result_cache(args))
+    if args.stats:
+        print(f"Worker finished: {worker.completed} converted, {worker.failed} failed", file=sys.stderr)
+
+def run_batch_mode(parser, args):
+    """Convert every input over a process pool and report throughput and failures."""
+    from batch import collect_inputs, print_progress, run_batch
+
+    if not args.output_dir:
+        parser.error("--batch requires --output-dir")
+    inputs = collect_inputs(args.image_path, args.file_list)
+    if not inputs:
+        parser.error("no input images found")
+
+    summary = run_batch(inputs, args.output_dir, jobs=args.jobs, progress=print_progress,
+                        output_width=args.width, density=args.density, color=args.color,
+                        glyph_mode=args.glyph_mode, filters=args.filters, result_cache=make_result_cache(args))
+
+    print(f"Converted {summary['converted']}/{len(inputs)} images in {summary['seconds']:.2f}s "
+          f"({summary['images_per_second']:.1f} images/s)", file=sys.stderr)
+    for image_path, error in summary["failed"]:
+        print(f"  failed: {image_path}: {error}", file=sys.stderr)
+    if summary["failed"]:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
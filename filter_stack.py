@@ -0,0 +1,89 @@
+from PIL import ImageFilter
+
+# Filters offered by the GUI and CLI, by name, in menu order
+FILTERS = {
+    "blur": ImageFilter.BLUR,
+    "smooth": ImageFilter.SMOOTH,
+    "sharpen": ImageFilter.SHARPEN,
+    "detail": ImageFilter.DETAIL,
+    "edge_enhance": ImageFilter.EDGE_ENHANCE,
+    "find_edges": ImageFilter.FIND_EDGES,
+    "contour": ImageFilter.CONTOUR,
+    "emboss": ImageFilter.EMBOSS,
+    "median": ImageFilter.MedianFilter(3),
+}
+
+def filter_label(name):
+    """Human-readable name of a filter, e.g. ``Edge Enhance``."""
+    return name.replace("_", " ").title()
+
+def filter_halo(name):
+    """Rows a filter reads beyond each output row, i.e. half its kernel height."""
+    image_filter = FILTERS[name]
+    size = getattr(image_filter, "size", None) or image_filter.filterargs[0][1]
+    return size // 2
+
+def apply_filter(image, name):
+    """Apply the named filter to an image."""
+    return image.filter(FILTERS[name])
+
+class FilterStack:
+    """Ordered list of filter names with undo and redo.
+
+    The stack only records names; the converter applies them (see its
+    ``filters`` parameter) to the image at working resolution and caches
+    the result of every prefix, so pushing or undoing the top filter only
+    recomputes one step. Pushing a filter discards the redo history.
+    """
+
+    def __init__(self, filters=()):
+        for name in filters:
+            self._check(name)
+        self._filters = list(filters)
+        self._undone = []
+
+    @staticmethod
+    def _check(name):
+        if name not in FILTERS:
+            raise ValueError(f"Unknown filter {name!r}; choose from {', '.join(FILTERS)}")
+
+    @property
+    def filters(self):
+        """The filter names, first applied first, as a tuple."""
+        return tuple(self._filters)
+
+    def __len__(self):
+        return len(self._filters)
+
+    def push(self, name):
+        """Add a filter on top of the stack."""
+        self._check(name)
+        self._filters.append(name)
+        self._undone.clear()
+
+    def can_undo(self):
+        return bool(self._filters)
+
+    def can_redo(self):
+        return bool(self._undone)
+
+    def undo(self):
+        """Remove the top filter, keeping it for `redo`; returns its name or None."""
+        if not self._filters:
+            return None
+        name = self._filters.pop()
+        self._undone.append(name)
+        return name
+
+    def redo(self):
+        """Put back the most recently undone filter; returns its name or None."""
+        if not self._undone:
+            return None
+        name = self._undone.pop()
+        self._filters.append(name)
+        return name
+
+    def clear(self):
+        """Remove every filter and the redo history."""
+        self._filters.clear()
+        self._undone.clear()
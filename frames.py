@@ -0,0 +1,120 @@
+import glob
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from PIL import Image, ImageSequence
+from utils import is_image_file
+
+# Frames decoded ahead of the converter; bounds memory regardless of clip length
+DEFAULT_PREFETCH = 4
+
+# End-of-stream marker passed through the prefetch queue
+_DONE = object()
+
+def _natural_key(path):
+    """Sort key that orders frame_2.png before frame_10.png."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+def iter_frames(source):
+    """Lazily yield RGB frames from an animated file or an image sequence.
+
+    ``source`` may be a multi-frame file (animated GIF, multi-page TIFF, ...),
+    a directory of numbered images, or a glob pattern such as
+    ``"frames/frame_*.png"``. Only the frame being yielded is held in memory.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+        paths = sorted((path for path in paths if is_image_file(path)), key=_natural_key)
+    elif glob.has_magic(source):
+        paths = sorted(glob.glob(source), key=_natural_key)
+    else:
+        with Image.open(source) as image:
+            for frame in ImageSequence.Iterator(image):
+                yield frame.convert("RGB")
+        return
+
+    for path in paths:
+        with Image.open(path) as image:
+            yield image.convert("RGB")
+
+def prefetch_frames(frames, prefetch=DEFAULT_PREFETCH):
+    """Decode frames on a background thread, at most ``prefetch`` ahead of the consumer."""
+    buffer = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def decode():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    return
+                buffer.put(frame)
+            buffer.put(_DONE)
+        except Exception as e:
+            buffer.put(e)
+
+    thread = threading.Thread(target=decode, name="frame-decoder", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Unblock the decoder if the consumer stopped early
+        stop.set()
+        while not buffer.empty():
+            buffer.get_nowait()
+
+def convert_frames(source, converter, prefetch=DEFAULT_PREFETCH):
+    """Yield the ASCII art of every frame, decoding the next frames while converting."""
+    for frame in prefetch_frames(iter_frames(source), prefetch):
+        yield converter._convert(frame)
+
+def write_frames(source, converter, output_dir, prefetch=DEFAULT_PREFETCH):
+    """Write each converted frame to ``output_dir/frame_00001.txt`` and so on.
+
+    Returns a summary dict with the frame count, elapsed seconds and frames per second.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    count = 0
+    for count, ascii_art in enumerate(convert_frames(source, converter, prefetch), start=1):
+        with open(os.path.join(output_dir, f"frame_{count:05d}.txt"), "w") as file:
+            file.write(ascii_art)
+    seconds = time.perf_counter() - started
+    return {"frames": count, "seconds": seconds, "fps": count / seconds if seconds > 0 else 0.0}
+
+def play_frames(source, converter, fps=10.0, out=None, prefetch=DEFAULT_PREFETCH):
+    """Play frames as a terminal animation held to ``fps``.
+
+    Frames whose display slot has already passed when they come off the
+    decoder are dropped without being converted, so playback keeps real time
+    when conversion falls behind. Returns a summary dict with shown and
+    dropped frame counts.
+    """
+    out = out or sys.stdout
+    interval = 1.0 / fps
+    shown = dropped = 0
+    # Clear the screen once; each frame then redraws from the home position
+    out.write("\x1b[2J")
+    started = time.perf_counter()
+    for index, frame in enumerate(prefetch_frames(iter_frames(source), prefetch)):
+        deadline = started + index * interval
+        if time.perf_counter() > deadline + interval:
+            dropped += 1
+            continue
+        ascii_art = converter._convert(frame)
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        out.write("\x1b[H" + ascii_art + "\n")
+        out.flush()
+        shown += 1
+    seconds = time.perf_counter() - started
+    return {"frames": shown + dropped, "shown": shown, "dropped": dropped, "seconds": seconds}
@@ -0,0 +1,116 @@
+import functools
+import hashlib
+import os
+import tempfile
+import numpy as np
+import PIL
+from PIL import Image
+from rasterizer import DEFAULT_FONT_PATH, DEFAULT_FONT_SIZE, GlyphAtlas, load_font
+from result_cache import default_cache_dir
+
+# Every printable ASCII character, space first
+SHAPE_CHARSET = "".join(chr(code) for code in range(32, 127))
+# Sub-cells per character cell as (rows, columns); cells are about twice as tall as wide
+DEFAULT_GRID = (4, 2)
+# Bumped whenever the feature computation changes, orphaning cached matrices
+FEATURE_VERSION = 1
+# Cells scored per matrix product, bounding the (cells x glyphs) score buffer
+MATCH_CHUNK = 16384
+
+def glyph_features(charset=SHAPE_CHARSET, font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE,
+                   grid=DEFAULT_GRID):
+    """Render the charset and average each glyph's ink over a ``grid`` of sub-cells.
+
+    Returns a float32 matrix with one row of ``rows * columns`` coverage
+    values per glyph, scaled so the inkiest glyph has a mean coverage of 1
+    and a solid black block can match it.
+    """
+    rows, columns = grid
+    atlas = GlyphAtlas(charset, load_font(font_path, size))
+    features = np.empty((len(charset), rows * columns), dtype=np.float32)
+    for index, mask in enumerate(atlas.masks):
+        # BOX averages every source pixel into the sub-cell it falls in
+        cells = Image.fromarray(mask, "L").resize((columns, rows), Image.BOX)
+        features[index] = np.asarray(cells, dtype=np.float32).ravel() / 255
+    densest = features.mean(axis=1).max()
+    if densest > 0:
+        features /= densest
+    return features
+
+def _features_path(charset, font_path, size, grid, cache_dir):
+    digest = hashlib.sha256()
+    try:
+        with open(font_path, "rb") as file:
+            digest.update(file.read())
+    except OSError:
+        pass
+    # Pillow's version decides which fallback font is used when font_path is unusable
+    digest.update(repr((FEATURE_VERSION, PIL.__version__, charset, size, tuple(grid))).encode("utf-8"))
+    return os.path.join(cache_dir or default_cache_dir(), "glyph_features", digest.hexdigest() + ".npy")
+
+def load_glyph_features(charset=SHAPE_CHARSET, font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE,
+                        grid=DEFAULT_GRID, cache_dir=None):
+    """`glyph_features`, read from or saved to the on-disk cache for this font and charset."""
+    path = _features_path(charset, font_path, size, grid, cache_dir)
+    try:
+        features = np.load(path)
+        if features.shape == (len(charset), grid[0] * grid[1]):
+            return features
+    except (OSError, ValueError):
+        pass
+
+    features = glyph_features(charset, font_path, size, grid)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            np.save(file, features)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # a read-only cache only costs the recomputation next time
+    return features
+
+class GlyphMatcher:
+    """Pick, for every cell, the glyph whose shape is closest to the image block.
+
+    Cells and glyphs are compared as vectors of sub-cell ink coverage, where
+    a block's coverage is ``1 - gray / 255``. The nearest glyph by squared
+    distance maximizes ``2 * coverage . glyph - |glyph|^2``; with the
+    coverage expanded that is an affine function of the gray values, so a
+    whole chunk of cells is scored against every glyph with one matrix
+    product straight from the 8-bit pixels.
+    """
+
+    def __init__(self, charset=SHAPE_CHARSET, font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE,
+                 grid=DEFAULT_GRID, cache_dir=None):
+        self.charset = charset
+        self.grid = grid
+        features = load_glyph_features(charset, font_path, size, grid, cache_dir)
+        # 2 * (1 - gray / 255) . g - |g|^2 == gray . (-2 g / 255) + (2 sum(g) - |g|^2)
+        self._weights = np.ascontiguousarray(-2 / 255 * features.T, dtype=np.float32)
+        self._offsets = 2 * features.sum(axis=1) - (features * features).sum(axis=1)
+
+    def match(self, gray):
+        """Glyph indices (uint8, one per cell) for a 2-D array of gray values, 0 being black.
+
+        ``gray`` should be ``rows * grid rows`` by ``columns * grid columns``;
+        partial cells at the edges are ignored.
+        """
+        grid_rows, grid_columns = self.grid
+        height, width = gray.shape[0] // grid_rows, gray.shape[1] // grid_columns
+        blocks = (gray[:height * grid_rows, :width * grid_columns]
+                  .reshape(height, grid_rows, width, grid_columns)
+                  .transpose(0, 2, 1, 3)
+                  .reshape(height * width, grid_rows * grid_columns)
+                  .astype(np.float32))
+        indices = np.empty(height * width, dtype=np.uint8)
+        for start in range(0, len(blocks), MATCH_CHUNK):
+            scores = blocks[start:start + MATCH_CHUNK] @ self._weights
+            scores += self._offsets
+            indices[start:start + MATCH_CHUNK] = scores.argmax(axis=1)
+        return indices.reshape(height, width)
+
+@functools.lru_cache(maxsize=4)
+def get_matcher(charset=SHAPE_CHARSET, grid=DEFAULT_GRID):
+    """Shared GlyphMatcher for the bundled font."""
+    return GlyphMatcher(charset, grid=grid)
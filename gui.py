@@ -1,13 +1,18 @@
 import sys
 import os
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QLabel, QPushButton, QSlider, QFileDialog, QTextEdit, QVBoxLayout, QHBoxLayout, QWidget,
-    QComboBox, QLineEdit, QCheckBox, QMessageBox, QDialog, QVBoxLayout, QRadioButton, QButtonGroup
+    QApplication, QMainWindow, QLabel, QPushButton, QSlider, QFileDialog, QVBoxLayout, QHBoxLayout, QWidget,
+    QComboBox, QLineEdit, QCheckBox, QMessageBox, QDialog, QVBoxLayout, QRadioButton, QButtonGroup,
+    QProgressBar, QSpinBox
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPixmap, QFont, QFontDatabase
-from ascii_converter import ASCIIConverter
-from PIL import Image, ImageFilter, ImageOps
+from PyQt5.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QPixmap, QImage, QImageReader, QFont, QFontDatabase, QKeySequence
+from ascii_canvas import AsciiCanvas
+from ascii_converter import ASCIIConverter, ConversionCancelled
+from filter_stack import FILTERS, FilterStack, apply_filter, filter_label
+from result_cache import ResultCache
+from stage_cache import StageCache
+from PIL import Image
 
 class ImageTransformDialog(QDialog):
     def __init__(self, parent=None):
@@ -17,22 +22,14 @@ class ImageTransformDialog(QDialog):
         
         layout = QVBoxLayout()
         
-        # Filter group
+        # Filter group, one button per filter the converter knows
         filter_group = QButtonGroup(self)
-        self.blur_radio = QRadioButton("Blur")
-        self.sharpen_radio = QRadioButton("Sharpen")
-        self.edge_enhance_radio = QRadioButton("Edge Enhance")
-        self.contour_radio = QRadioButton("Contour")
-        
-        filter_group.addButton(self.blur_radio)
-        filter_group.addButton(self.sharpen_radio)
-        filter_group.addButton(self.edge_enhance_radio)
-        filter_group.addButton(self.contour_radio)
-        
-        layout.addWidget(self.blur_radio)
-        layout.addWidget(self.sharpen_radio)
-        layout.addWidget(self.edge_enhance_radio)
-        layout.addWidget(self.contour_radio)
+        self.filter_radios = {}
+        for name in FILTERS:
+            radio = QRadioButton(filter_label(name))
+            filter_group.addButton(radio)
+            layout.addWidget(radio)
+            self.filter_radios[name] = radio
         
         # Apply button
         apply_btn = QPushButton("Apply Transformation")
@@ -42,21 +39,124 @@ class ImageTransformDialog(QDialog):
         self.setLayout(layout)
         
     def get_selected_filter(self):
-        if self.blur_radio.isChecked():
-            return ImageFilter.BLUR
-        elif self.sharpen_radio.isChecked():
-            return ImageFilter.SHARPEN
-        elif self.edge_enhance_radio.isChecked():
-            return ImageFilter.EDGE_ENHANCE
-        elif self.contour_radio.isChecked():
-            return ImageFilter.CONTOUR
+        """Name of the chosen filter, or None."""
+        for name, radio in self.filter_radios.items():
+            if radio.isChecked():
+                return name
         return None
 
+def pil_to_pixmap(image):
+    """Convert a PIL image to a QPixmap without going through a file."""
+    image = image.convert("RGBA")
+    data = image.tobytes("raw", "RGBA")
+    qimage = QImage(data, image.width, image.height, image.width * 4, QImage.Format_RGBA8888)
+    # fromImage copies the pixels, so ``data`` may be released afterwards
+    return QPixmap.fromImage(qimage)
+
+# Width of the first, coarsest progressive pass
+PREVIEW_WIDTH = 40
+
+def progressive_widths(width, preview_width=PREVIEW_WIDTH):
+    """Output widths of the passes for ``width``: a preview, 4x steps, then the full width."""
+    if width < 2 * preview_width:
+        return [width]
+    widths = [preview_width]
+    while widths[-1] * 8 <= width:
+        widths.append(widths[-1] * 4)
+    widths.append(width)
+    return widths
+
+def load_thumbnail(image_path, size):
+    """Load an image scaled to fit ``size`` x ``size``.
+
+    The reader is asked for the scaled size up front, so formats that can
+    decode at reduced resolution (JPEG) never decode the full image.
+    """
+    reader = QImageReader(image_path)
+    # The converter ignores EXIF orientation, so the preview must too or the two disagree
+    reader.setAutoTransform(False)
+    original = reader.size()
+    if original.isValid():
+        reader.setScaledSize(original.scaled(size, size, Qt.KeepAspectRatio))
+    return QPixmap.fromImage(reader.read())
+
+class ConversionSignals(QObject):
+    """Signals emitted by a ConversionTask back on the GUI thread."""
+    # generation, ascii art, whether this is the final (full width) pass
+    finished = pyqtSignal(int, str, bool)
+
+class ConversionTask(QRunnable):
+    """Run one coarse-to-fine conversion off the GUI thread.
+
+    Each pass is emitted as soon as it is done, so a narrow preview shows up
+    long before the full width is ready. All passes share the stage cache;
+    apart from JPEG files, which draft-decode small previews cheaply, the
+    previews decode at the final pass's resolution so the image is decoded
+    only once. Each task carries the generation number it was scheduled
+    under; once a newer request has been made, the running pass stops at its
+    next stage and no further passes start.
+    """
+
+    def __init__(self, generation, is_current, converter_kwargs, widths):
+        super().__init__()
+        self.generation = generation
+        self.is_current = is_current
+        self.converter_kwargs = converter_kwargs
+        self.widths = widths
+        self.signals = ConversionSignals()
+
+    def run(self):
+        final_width = self.widths[-1]
+        source = self.converter_kwargs["image_path"]
+        result_cache = self.converter_kwargs.get("result_cache")
+        widths = self.widths
+        if result_cache is not None:
+            # A stored final result beats any preview
+            try:
+                key = ASCIIConverter(**dict(self.converter_kwargs, output_width=final_width))._result_key()
+            except OSError:
+                key = None  # the final pass reports the error
+            if key is not None and key in result_cache:
+                widths = [final_width]
+        
+        is_jpeg = isinstance(source, str) and os.path.splitext(source)[1].lower() in (".jpg", ".jpeg")
+        for width in widths:
+            final = width == final_width
+            kwargs = dict(self.converter_kwargs, output_width=width,
+                          should_stop=lambda: not self.is_current(self.generation))
+            if not final:
+                kwargs.update(result_cache=None, decode_width=None if is_jpeg else final_width)
+            try:
+                ascii_art = ASCIIConverter(**kwargs).convert_to_ascii()
+            except ConversionCancelled:
+                return
+            self.signals.finished.emit(self.generation, ascii_art, final)
+
 class ArtASCIIStudio(QMainWindow):
+    # Quiet period after the last slider event before a conversion starts
+    UPDATE_DELAY_MS = 60
+
+
     def __init__(self):
         super().__init__()
         self.current_image_path = None
-        self.current_image = None
+        # Filters applied by the converter at working resolution; nothing is written to disk
+        self.filter_stack = FilterStack()
+        # Small copy of the image the filter stack is previewed on
+        self.thumbnail = None
+        # Decoded/resized/adjusted stages survive slider changes
+        self.stage_cache = StageCache()
+        # Finished art on disk, so reopening a file with the same settings skips decoding
+        self.result_cache = ResultCache()
+        # Conversions run one at a time off the GUI thread; only the newest
+        # generation's result is displayed
+        self.conversion_pool = QThreadPool(self)
+        self.conversion_pool.setMaxThreadCount(1)
+        self.conversion_generation = 0
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(self.UPDATE_DELAY_MS)
+        self.update_timer.timeout.connect(self.update_ascii_art)
         self.init_ui()
 
     def init_ui(self):
@@ -82,14 +182,28 @@ class ArtASCIIStudio(QMainWindow):
         layout.addWidget(self.image_label)
 
         # ASCII art display
-        self.ascii_display = QTextEdit(self)
-        self.ascii_display.setFont(self.retro_font)
-        self.ascii_display.setReadOnly(True)
+        # Paints only the visible part of the art, so large outputs stay responsive
+        self.ascii_display = AsciiCanvas(self)
         layout.addWidget(self.ascii_display)
 
+        # Busy indicator shown while a conversion is running
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setMaximumHeight(8)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
         # Controls
         controls_layout = QHBoxLayout()
 
+        # Output width in characters; wide outputs are refined progressively
+        self.width_spinbox = QSpinBox(self)
+        self.width_spinbox.setRange(20, 2000)
+        self.width_spinbox.setValue(100)
+        controls_layout.addWidget(QLabel("Width:"))
+        controls_layout.addWidget(self.width_spinbox)
+
         # Density slider
         self.density_slider = QSlider(Qt.Horizontal)
         self.density_slider.setMinimum(1)
@@ -116,6 +230,14 @@ class ArtASCIIStudio(QMainWindow):
         controls_layout.addWidget(QLabel("Contrast:"))
         controls_layout.addWidget(self.contrast_slider)
 
+        # Gamma slider
+        self.gamma_slider = QSlider(Qt.Horizontal)
+        self.gamma_slider.setMinimum(20)
+        self.gamma_slider.setMaximum(300)
+        self.gamma_slider.setValue(100)
+        controls_layout.addWidget(QLabel("Gamma:"))
+        controls_layout.addWidget(self.gamma_slider)
+
         # Invert checkbox
         self.invert_checkbox = QCheckBox("Invert Colors", self)
         controls_layout.addWidget(self.invert_checkbox)
@@ -148,6 +270,21 @@ class ArtASCIIStudio(QMainWindow):
         self.transform_image_btn.clicked.connect(self.transform_image)
         controls_layout.addWidget(self.transform_image_btn)
 
+        # Undo/redo of the filter stack
+        self.undo_filter_btn = QPushButton("Undo Filter", self)
+        self.undo_filter_btn.setShortcut(QKeySequence(QKeySequence.Undo))
+        self.undo_filter_btn.clicked.connect(self.undo_filter)
+        controls_layout.addWidget(self.undo_filter_btn)
+
+        self.redo_filter_btn = QPushButton("Redo Filter", self)
+        self.redo_filter_btn.setShortcut(QKeySequence(QKeySequence.Redo))
+        self.redo_filter_btn.clicked.connect(self.redo_filter)
+        controls_layout.addWidget(self.redo_filter_btn)
+
+        self.filters_label = QLabel(self)
+        controls_layout.addWidget(self.filters_label)
+        self.update_filter_controls()
+
         # Detail preservation slider
         self.detail_slider = QSlider(Qt.Horizontal)
         self.detail_slider.setMinimum(0)
@@ -161,12 +298,14 @@ class ArtASCIIStudio(QMainWindow):
         layout.addLayout(controls_layout)
         main_widget.setLayout(layout)
 
-        # Connect sliders to live preview
-        self.density_slider.valueChanged.connect(self.update_ascii_art)
-        self.brightness_slider.valueChanged.connect(self.update_ascii_art)
-        self.contrast_slider.valueChanged.connect(self.update_ascii_art)
-        self.invert_checkbox.stateChanged.connect(self.update_ascii_art)
-        self.detail_slider.valueChanged.connect(self.update_ascii_art)
+        # Connect sliders to live preview; bursts of events are coalesced
+        self.width_spinbox.valueChanged.connect(self.schedule_update)
+        self.density_slider.valueChanged.connect(self.schedule_update)
+        self.brightness_slider.valueChanged.connect(self.schedule_update)
+        self.contrast_slider.valueChanged.connect(self.schedule_update)
+        self.gamma_slider.valueChanged.connect(self.schedule_update)
+        self.invert_checkbox.stateChanged.connect(self.schedule_update)
+        self.detail_slider.valueChanged.connect(self.schedule_update)
 
     def drag_enter_event(self, event):
         if event.mimeData().hasUrls():
@@ -181,31 +320,63 @@ class ArtASCIIStudio(QMainWindow):
     def process_image(self, image_path):
         """Convert the image to ASCII and display it."""
         self.current_image_path = image_path
-        pixmap = QPixmap(image_path).scaled(400, 400, Qt.KeepAspectRatio)
-        self.image_label.setPixmap(pixmap)
+        # Filters (see transform_image) start over with every new image
+        self.filter_stack.clear()
+        self.thumbnail = None
+        self.update_filter_controls()
         self.update_ascii_art()
+        self.image_label.setPixmap(load_thumbnail(image_path, 400))
+
+    def schedule_update(self):
+        """Restart the debounce timer; the conversion runs once events settle."""
+        self.update_timer.start()
 
     def update_ascii_art(self):
-        """Update the ASCII art based on current settings."""
+        """Start a background conversion for the current settings."""
+        self.update_timer.stop()
         if not self.current_image_path:
             return
         
         density = ["coarse", "medium", "fine"][self.density_slider.value() - 1]
         brightness = self.brightness_slider.value() / 100
         contrast = self.contrast_slider.value() / 100
+        gamma = self.gamma_slider.value() / 100
         invert = self.invert_checkbox.isChecked()
         detail_preservation = self.detail_slider.value() / 100  # New detail preservation parameter
         
-        converter = ASCIIConverter(
-            self.current_image_path,
+        converter_kwargs = dict(
+            image_path=self.current_image_path,
+            filters=self.filter_stack.filters,
             density=density,
             brightness=brightness,
             contrast=contrast,
+            gamma=gamma,
             invert=invert,
-            detail_preservation=detail_preservation  # Pass detail preservation
+            detail_preservation=detail_preservation,  # Pass detail preservation
+            cache=self.stage_cache,
+            result_cache=self.result_cache
         )
-        ascii_art = converter.convert_to_ascii()
+        
+        # Supersede everything scheduled so far and drop jobs not yet started
+        self.conversion_generation += 1
+        self.conversion_pool.clear()
+        task = ConversionTask(self.conversion_generation, self.is_current_generation, converter_kwargs,
+                              progressive_widths(self.width_spinbox.value()))
+        task.signals.finished.connect(self.show_ascii_art)
+        self.progress_bar.show()
+        self.conversion_pool.start(task)
+
+    def is_current_generation(self, generation):
+        """Check whether a conversion request is still the newest one."""
+        return generation == self.conversion_generation
+
+    def show_ascii_art(self, generation, ascii_art, final):
+        """Display a finished pass unless a newer conversion has been requested."""
+        if generation != self.conversion_generation:
+            return
         self.ascii_display.setPlainText(ascii_art)
+        if final:
+            self.progress_bar.hide()
 
     def change_theme(self, theme):
         """Change the UI theme."""
@@ -229,15 +400,11 @@ class ArtASCIIStudio(QMainWindow):
                 file.write(self.ascii_display.toPlainText())
 
     def export_image(self):
-        """Export ASCII art as an image."""
+        """Export ASCII art as an image sized to the art."""
         file_path, _ = QFileDialog.getSaveFileName(self, "Save ASCII Art", "", "PNG Files (*.png);;JPG Files (*.jpg)")
         if file_path:
-            from PIL import Image, ImageDraw, ImageFont
-            ascii_text = self.ascii_display.toPlainText()
-            font = ImageFont.load_default()
-            image = Image.new("RGB", (800, 600), "white")
-            draw = ImageDraw.Draw(image)
-            draw.text((10, 10), ascii_text, font=font, fill="black")
+            from rasterizer import render_text
+            image = render_text(self.ascii_display.toPlainText())
             image.save(file_path)
 
     def copy_to_clipboard(self):
@@ -252,7 +419,7 @@ class ArtASCIIStudio(QMainWindow):
             self.process_image(file_path)
 
     def transform_image(self):
-        """Open transformation dialog and apply selected filter."""
+        """Open transformation dialog and push the selected filter onto the stack."""
         if not self.current_image_path:
             QMessageBox.warning(self, "No Image", "Please load an image first.")
             return
@@ -261,23 +428,54 @@ class ArtASCIIStudio(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             selected_filter = dialog.get_selected_filter()
             if selected_filter:
-                try:
-                    # Open the original image
-                    image = Image.open(self.current_image_path)
-                    
-                    # Apply the selected filter
-                    transformed_image = image.filter(selected_filter)
-                    
-                    # Save the transformed image
-                    temp_path = os.path.join(os.path.dirname(self.current_image_path), 
-                                             f"transformed_{os.path.basename(self.current_image_path)}")
-                    transformed_image.save(temp_path)
-                    
-                    # Process the transformed image
-                    self.process_image(temp_path)
-                    
-                except Exception as e:
-                    QMessageBox.critical(self, "Transformation Error", str(e))
+                self.filter_stack.push(selected_filter)
+                self.filters_changed()
+
+    def undo_filter(self):
+        """Remove the most recently applied filter."""
+        if self.filter_stack.undo() is not None:
+            self.filters_changed()
+
+    def redo_filter(self):
+        """Re-apply the most recently undone filter."""
+        if self.filter_stack.redo() is not None:
+            self.filters_changed()
+
+    def filters_changed(self):
+        """Refresh the preview, the controls and the art after an edit of the filter stack.
+
+        The converter caches every prefix of the stack, so only the changed
+        top filter and the stages after it are recomputed.
+        """
+        self.update_filter_controls()
+        try:
+            self.image_label.setPixmap(self.filtered_thumbnail())
+        except Exception as e:
+            QMessageBox.critical(self, "Transformation Error", str(e))
+            return
+        self.update_ascii_art()
+
+    def filtered_thumbnail(self):
+        """The preview pixmap: the thumbnail with the filter stack applied."""
+        if not self.filter_stack.filters:
+            return load_thumbnail(self.current_image_path, 400)
+        if self.thumbnail is None:
+            image = Image.open(self.current_image_path)
+            image.draft("RGB", (400, 400))
+            image = image.convert("RGB")
+            image.thumbnail((400, 400))
+            self.thumbnail = image
+        image = self.thumbnail
+        for name in self.filter_stack.filters:
+            image = apply_filter(image, name)
+        return pil_to_pixmap(image)
+
+    def update_filter_controls(self):
+        """Enable undo/redo as the history allows and list the active filters."""
+        self.undo_filter_btn.setEnabled(self.filter_stack.can_undo())
+        self.redo_filter_btn.setEnabled(self.filter_stack.can_redo())
+        names = [filter_label(name) for name in self.filter_stack.filters]
+        self.filters_label.setText("Filters: " + (" > ".join(names) if names else "none"))
 
 def main():
     app = QApplication(sys.argv)
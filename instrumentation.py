@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+# Individual spans kept for trace export; aggregates are always complete
+MAX_RECORDED_SPANS = 100000
+
+_enabled = False
+_lock = threading.Lock()
+_spans = []
+_stage_totals = {}
+_counters = Counter()
+_started = time.perf_counter()
+
+class _NullSpan:
+    """Span returned while instrumentation is off; entering it does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        _record(self.name, self.start, end - self.start)
+        return False
+
+def enable():
+    """Start recording spans and counters."""
+    global _enabled
+    _enabled = True
+
+def disable():
+    """Stop recording; data gathered so far is kept until `reset`."""
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Drop all recorded spans and counters."""
+    global _started
+    with _lock:
+        _spans.clear()
+        _stage_totals.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+def span(name):
+    """Time a block as ``with span("resize"): ...``; free when disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def count(name, value=1):
+    """Add ``value`` to the named counter when enabled."""
+    if _enabled:
+        with _lock:
+            _counters[name] += value
+
+def _record(name, start, duration):
+    with _lock:
+        if len(_spans) < MAX_RECORDED_SPANS:
+            _spans.append((name, start, duration, threading.get_ident()))
+        calls, total, longest = _stage_totals.get(name, (0, 0.0, 0.0))
+        _stage_totals[name] = (calls + 1, total + duration, max(longest, duration))
+
+def summary():
+    """Per-span call counts and timings plus counters, as a JSON-ready dict."""
+    with _lock:
+        spans = {
+            name: {
+                "calls": calls,
+                "total_seconds": total,
+                "mean_seconds": total / calls,
+                "max_seconds": longest,
+            }
+            for name, (calls, total, longest) in sorted(_stage_totals.items())
+        }
+        return {
+            "wall_seconds": time.perf_counter() - _started,
+            "spans": spans,
+            "counters": dict(sorted(_counters.items())),
+        }
+
+def export_json(path):
+    """Write the run summary and the recorded spans as JSON."""
+    data = summary()
+    with _lock:
+        data["events"] = [
+            {"name": name, "start": start - _started, "seconds": duration, "thread": thread}
+            for name, start, duration, thread in _spans
+        ]
+    with open(path, "w") as file:
+        json.dump(data, file, indent=2)
+
+def export_trace(path):
+    """Write spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+    pid = os.getpid()
+    with _lock:
+        events = [
+            {"name": name, "ph": "X", "ts": (start - _started) * 1e6, "dur": duration * 1e6,
+             "pid": pid, "tid": thread}
+            for name, start, duration, thread in _spans
+        ]
+        events.extend(
+            {"name": name, "ph": "C", "ts": 0, "pid": pid, "args": {name: value}}
+            for name, value in _counters.items()
+        )
+    with open(path, "w") as file:
+        json.dump({"traceEvents": events}, file)
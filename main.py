@@ -1,9 +1,13 @@
 import sys
-from gui import main as gui_main
-from cli import main as cli_main
 
-if __name__ == "__main__":
+def main():
+    # Import only the front end that is about to run: the CLI never pays for PyQt5
     if len(sys.argv) > 1:
+        from cli import main as cli_main
         cli_main()
     else:
+        from gui import main as gui_main
         gui_main()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import functools
+import os
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+DEFAULT_FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "retro_font.ttf")
+DEFAULT_FONT_SIZE = 12
+# Size Pillow's fixed bitmap font is drawn at; atlases built from it are scaled from there
+BITMAP_FONT_SIZE = 11
+
+def load_font(font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE):
+    """Load a TrueType font, falling back to Pillow's default font."""
+    try:
+        return ImageFont.truetype(font_path, size)
+    except (OSError, ValueError):
+        try:
+            return ImageFont.load_default(size=size)  # scalable default, Pillow >= 10.1
+        except TypeError:
+            return ImageFont.load_default()
+
+class GlyphAtlas:
+    """Every glyph of a charset pre-rendered once into equally sized cells.
+
+    ``masks[i]`` is the coverage (0-255) of ``charset[i]`` in a
+    ``cell_height`` x ``cell_width`` cell.
+    """
+
+    def __init__(self, charset, font=None):
+        self.charset = charset
+        font = font or load_font()
+        boxes = [font.getbbox(char) for char in charset]
+        self.cell_width = max(1, max(int(np.ceil(font.getlength(char))) for char in charset))
+        top = min(box[1] for box in boxes)
+        self.cell_height = max(1, max(box[3] for box in boxes) - top)
+
+        self.masks = np.zeros((len(charset), self.cell_height, self.cell_width), dtype=np.uint8)
+        for index, char in enumerate(charset):
+            cell = Image.new("L", (self.cell_width, self.cell_height), 0)
+            offset = (self.cell_width - font.getlength(char)) / 2
+            ImageDraw.Draw(cell).text((offset, -top), char, fill=255, font=font)
+            self.masks[index] = np.asarray(cell)
+
+        # Byte value -> atlas index; characters outside the charset map to the first glyph
+        self.lookup = np.zeros(256, dtype=np.uint8)
+        for index, char in enumerate(charset):
+            self.lookup[ord(char)] = index
+
+    def text_to_indices(self, text):
+        """Convert newline-separated text to a 2-D array of atlas indices, padding short lines.
+
+        Empty text becomes one blank cell, so it still rasterizes to a saveable image.
+        """
+        lines = text.split("\n")
+        width = max(1, max(len(line) for line in lines))
+        codes = np.frombuffer("".join(line.ljust(width) for line in lines).encode("ascii", "replace"),
+                              dtype=np.uint8)
+        return self.lookup[codes].reshape(len(lines), width)
+
+    def scale(self, factor):
+        """Resample every glyph mask by ``factor``, for fonts that cannot be loaded at other sizes."""
+        cell_width = max(1, round(self.cell_width * factor))
+        cell_height = max(1, round(self.cell_height * factor))
+        if (cell_width, cell_height) == (self.cell_width, self.cell_height):
+            return
+        self.masks = np.stack([np.asarray(Image.fromarray(mask).resize((cell_width, cell_height), Image.BILINEAR))
+                               for mask in self.masks])
+        self.cell_width, self.cell_height = cell_width, cell_height
+
+@functools.lru_cache(maxsize=8)
+def get_atlas(charset, font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE):
+    """Return a cached GlyphAtlas for the charset and font.
+
+    Without FreeType, or before Pillow 10.1, the fallback font is a fixed-size
+    bitmap; its glyphs are then scaled so ``size`` still sets the cell size.
+    """
+    font = load_font(font_path, size)
+    atlas = GlyphAtlas(charset, font)
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        atlas.scale(size / BITMAP_FONT_SIZE)
+    return atlas
+
+def rasterize(glyph_indices, atlas, colors=None, foreground=(0, 0, 0), background=(255, 255, 255)):
+    """Build an RGB bitmap of the art, exactly ``cells x cell size`` pixels large.
+
+    The coverage bitmap is assembled by tiling atlas masks with array
+    indexing. ``colors`` is an optional (height, width, 3) array of per-cell
+    ink colors; otherwise every cell uses ``foreground``.
+    """
+    rows, columns = glyph_indices.shape
+    cell_height, cell_width = atlas.cell_height, atlas.cell_width
+    coverage = atlas.masks[glyph_indices]  # rows, columns, cell_height, cell_width
+    coverage = coverage.transpose(0, 2, 1, 3).reshape(rows * cell_height, columns * cell_width)
+
+    if colors is None:
+        return ImageOps.colorize(Image.fromarray(coverage, "L"), black=background, white=foreground)
+
+    # Blow the per-cell colors up to cell size and blend them in through the coverage mask
+    size = (columns * cell_width, rows * cell_height)
+    ink = Image.fromarray(np.ascontiguousarray(colors[..., :3], dtype=np.uint8), "RGB").resize(size, Image.NEAREST)
+    return Image.composite(ink, Image.new("RGB", size, tuple(background)), Image.fromarray(coverage, "L"))
+
+def render_text(text, font_path=DEFAULT_FONT_PATH, size=DEFAULT_FONT_SIZE, **kwargs):
+    """Rasterize plain ASCII art text; keyword arguments are passed to `rasterize`."""
+    charset = "".join(sorted(char for char in set(text) | {" ", "?"} if " " <= char <= "~"))
+    atlas = get_atlas(charset, font_path, size)
+    return rasterize(atlas.text_to_indices(text), atlas, **kwargs)
@@ -0,0 +1,209 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bumped whenever a change to the pipeline alters its output or the key, orphaning old entries
+CACHE_VERSION = 2
+# Source file digests remembered by file_digest, keyed on path, mtime and size
+MAX_REMEMBERED_DIGESTS = 64
+_file_digests = {}
+# Eviction trims the cache to this share of max_bytes so it does not run on every write
+LOW_WATER = 0.9
+
+def default_cache_dir():
+    """``$ARTASCII_CACHE_DIR``, else ``artascii-studio`` in the user cache directory."""
+    if os.environ.get("ARTASCII_CACHE_DIR"):
+        return os.environ["ARTASCII_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "artascii-studio")
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's contents, remembered while its mtime and size are unchanged.
+
+    Lets repeated lookups for the same file (every GUI slider change) skip
+    reading and hashing it again.
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    digest = _file_digests.get(memo_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+        if len(_file_digests) >= MAX_REMEMBERED_DIGESTS:
+            _file_digests.clear()
+        _file_digests[memo_key] = digest
+    return digest
+
+class ResultCache:
+    """Finished ASCII art on disk, addressed by image content and settings.
+
+    Every entry is a file named by the SHA-256 of the encoded image bytes and
+    the conversion parameters, so a hit needs no decode at all and any change
+    to the image or a setting is a different key. Files are written to a
+    temporary name and renamed into place, and a file vanishing under a
+    reader counts as a miss, so several processes can share one directory.
+    Reading an entry refreshes its modification time; once the directory
+    grows beyond ``max_bytes`` the least recently used files are deleted.
+
+    Instances are picklable and can be handed to worker processes; ``hits``
+    and ``misses`` count the lookups made through this instance.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Bytes on disk as last scanned plus what this instance wrote since
+        self._approx_bytes = None
+
+    @staticmethod
+    def key(data, params):
+        """Key for encoded image ``data`` converted with the ``params`` dict."""
+        return ResultCache.digest_key(hashlib.sha256(data).hexdigest(), params)
+
+    @staticmethod
+    def digest_key(content_digest, params):
+        """Key for an image whose encoded bytes have the SHA-256 hex digest ``content_digest``."""
+        digest = hashlib.sha256(content_digest.encode("ascii"))
+        digest.update(json.dumps([CACHE_VERSION, sorted(params.items())]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def __contains__(self, key):
+        """Whether ``key`` is stored; does not count as a lookup or refresh the entry."""
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Return the cached art for ``key``, or None on a miss."""
+        file = self.open(key)
+        if file is None:
+            return None
+        with file:
+            return file.read()
+
+    def open(self, key):
+        """Open the cached art for ``key`` as a text file, or return None on a miss.
+
+        Lets large entries be copied out without reading them into memory.
+        """
+        path = self._path(key)
+        try:
+            file = open(path, "r", encoding="utf-8", newline="")
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            # Only the LRU order depends on this; a read-only cache still serves hits
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return file
+
+    def put(self, key, text):
+        """Store ``text`` under ``key``, evicting old entries if over budget."""
+        with self.writer(key) as file:
+            file.write(text)
+
+    @contextlib.contextmanager
+    def writer(self, key):
+        """Context manager yielding a text file whose contents become the entry for ``key``.
+
+        The entry only appears, complete, when the block exits without an error.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8", newline="") as file:
+                yield file
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        if self._approx_bytes is None:
+            self._approx_bytes = self._scan_bytes()
+        else:
+            self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is under its low-water mark."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        limit = self.max_bytes * LOW_WATER
+        for path, _, size in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # already evicted by another process
+            total -= size
+        self._approx_bytes = total
+
+    def clear(self):
+        """Delete every entry."""
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._approx_bytes = 0
+
+    def stats(self):
+        """Hit/miss counts of this instance plus the entries and bytes currently on disk."""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _scan_bytes(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """(path, mtime, size) of every entry file."""
+        entries = []
+        try:
+            shards = os.scandir(self.directory)
+        except OSError:
+            return entries
+        with shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                try:
+                    files = os.scandir(shard.path)
+                except OSError:
+                    continue
+                with files:
+                    for entry in files:
+                        if not entry.name.endswith(".txt"):
+                            continue
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
@@ -0,0 +1,247 @@
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+from ascii_converter import ASCIIConverter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+# Distinct conversions allowed in flight before new ones are refused with 503
+DEFAULT_MAX_QUEUE = 64
+MAX_BODY_BYTES = 32 * 1024 * 1024
+# Latency samples kept for the percentiles in /metrics
+LATENCY_WINDOW = 1000
+
+# Distinct parameter sets a pool process keeps converters for before starting afresh
+MAX_WORKER_CONVERTERS = 32
+
+# Converters built in a pool process, one per distinct parameter set
+_worker_converters = {}
+
+def params_key(params):
+    """Hashable key of a dict of converter parameters."""
+    return tuple(sorted(params.items()))
+
+def worker_converter(params, result_cache=None):
+    """The converter for ``params`` in this pool process, built on first use and then reused.
+
+    Shared by the HTTP service and the NDJSON worker, whose pool processes
+    convert many images with few distinct parameter sets.
+    """
+    key = params_key(params)
+    converter = _worker_converters.get(key)
+    if converter is None:
+        if len(_worker_converters) >= MAX_WORKER_CONVERTERS:
+            _worker_converters.clear()
+        converter = _worker_converters[key] = ASCIIConverter(None, result_cache=result_cache, **params)
+    return converter
+
+def _convert_in_worker(data, params):
+    """Convert encoded image bytes in a pool process, reusing its converter for these params."""
+    return worker_converter(params)._convert(data)
+
+def parse_params(query):
+    """Turn a query string into ASCIIConverter keyword arguments, raising ValueError if invalid."""
+    values = {name: items[-1] for name, items in parse_qs(query).items()}
+    params = {
+        "output_width": int(values.pop("width", 100)),
+        "density": values.pop("density", "medium"),
+        "brightness": float(values.pop("brightness", 1.0)),
+        "contrast": float(values.pop("contrast", 1.0)),
+        "gamma": float(values.pop("gamma", 1.0)),
+        "invert": values.pop("invert", "false").lower() in ("1", "true", "yes"),
+        "detail_preservation": float(values.pop("detail_preservation", 0.7)),
+        "color": values.pop("color", "") or False,
+    }
+    if values:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(values))}")
+    if not 1 <= params["output_width"] <= 4000:
+        raise ValueError("width must be between 1 and 4000")
+    if params["gamma"] <= 0:
+        raise ValueError("gamma must be positive")
+    if params["density"] not in ("fine", "medium", "coarse"):
+        raise ValueError("density must be fine, medium or coarse")
+    if params["color"] not in (False, "truecolor", "256", "16"):
+        raise ValueError("color must be truecolor, 256 or 16")
+    return params
+
+class ConversionService:
+    """Conversion front end: request coalescing, backpressure and metrics.
+
+    Identical concurrent requests (same image bytes and parameters) share
+    one job. At most ``max_queue`` distinct jobs may be pending; beyond that
+    `convert` raises `QueueFull` so the caller can shed load.
+    """
+
+    class QueueFull(Exception):
+        pass
+
+    def __init__(self, executor=None, workers=None, max_queue=DEFAULT_MAX_QUEUE):
+        # Spawned rather than forked workers, so they never inherit (and keep
+        # open) the sockets of connections accepted so far
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+        self.max_queue = max_queue
+        self.inflight = {}
+        self.counters = collections.Counter()
+        self.max_queue_depth = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    async def convert(self, data, params):
+        """Return the ASCII art for encoded image bytes, sharing work with identical requests."""
+        started = time.perf_counter()
+        self.counters["requests"] += 1
+        key = (hashlib.sha256(data).hexdigest(), params_key(params))
+        future = self.inflight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+        else:
+            if len(self.inflight) >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise self.QueueFull()
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, _convert_in_worker, data, params)
+            self.inflight[key] = future
+            self.max_queue_depth = max(self.max_queue_depth, len(self.inflight))
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        try:
+            # shield: one client going away must not cancel a job others wait on
+            return await asyncio.shield(future)
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+
+    def metrics(self):
+        """Counters, queue depth and latency percentiles as a JSON-ready dict."""
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.counters["requests"],
+            "coalesced": self.counters["coalesced"],
+            "rejected": self.counters["rejected"],
+            "errors": self.counters["errors"],
+            "queue_depth": len(self.inflight),
+            "max_queue_depth": self.max_queue_depth,
+            "queue_limit": self.max_queue,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serve one HTTP/1.1 request per connection."""
+        try:
+            try:
+                status, content_type, body = await self._handle_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception:
+                # Whatever went wrong, the client gets an answer and the connection is closed
+                logger.exception("Error handling request")
+                status, content_type, body = 500, "text/plain", "Internal server error\n"
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                      500: "Internal Server Error", 503: "Service Unavailable"}[status]
+            payload = body.encode("utf-8")
+            headers = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}",
+                       f"Content-Length: {len(payload)}", "Connection: close"]
+            if status == 503:
+                headers.append("Retry-After: 1")
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) != 3:
+            return 400, "text/plain", "Malformed request line\n"
+        method, target, _ = request_line
+        url = urlsplit(target)
+
+        if method == "GET" and url.path == "/metrics":
+            return 200, "application/json", json.dumps(self.metrics()) + "\n"
+        if method == "GET" and url.path == "/health":
+            return 200, "text/plain", "ok\n"
+        if method != "POST" or url.path != "/convert":
+            return 404, "text/plain", "Use POST /convert or GET /metrics\n"
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            return 400, "text/plain", "Invalid Content-Length\n"
+        if length < 0:
+            return 400, "text/plain", "Invalid Content-Length\n"
+        if length > MAX_BODY_BYTES:
+            return 413, "text/plain", f"Body larger than {MAX_BODY_BYTES} bytes\n"
+        data = await reader.readexactly(length)
+        try:
+            params = parse_params(url.query)
+        except ValueError as e:
+            return 400, "text/plain", f"{e}\n"
+        try:
+            return 200, "text/plain", await self.convert(data, params)
+        except self.QueueFull:
+            return 503, "text/plain", "Too many pending conversions\n"
+        except Exception as e:
+            return 500, "text/plain", f"Error converting image: {e}\n"
+
+async def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=None, max_queue=DEFAULT_MAX_QUEUE):
+    """Run the conversion service until cancelled or sent SIGTERM."""
+    service = ConversionService(workers=workers, max_queue=max_queue)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} (POST /convert, GET /metrics)", file=sys.stderr)
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    terminated = False
+
+    def terminate():
+        nonlocal terminated
+        terminated = True
+        task.cancel()
+
+    # Without this a plain SIGTERM kills the process and orphans its pool workers
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminate)
+    except (NotImplementedError, RuntimeError):
+        pass  # Windows, or not the main thread
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        if not terminated:
+            raise
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGTERM)
+        except (NotImplementedError, RuntimeError):
+            pass
+        shutdown_executor(service.executor)
+
+def shutdown_executor(executor):
+    """Shut a pool down, dropping queued jobs where Python allows (3.9+)."""
+    try:
+        executor.shutdown(cancel_futures=True)
+    except TypeError:
+        executor.shutdown()
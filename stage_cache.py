@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+class StageCache:
+    """Bounded LRU cache for intermediate results of the conversion pipeline.
+
+    Keys are tuples whose first item names the stage and which embed the key
+    of the stage they were computed from, so a key changes whenever any
+    upstream parameter changes. Entries are evicted least recently used first
+    once either ``max_entries`` or ``max_bytes`` is exceeded; a single result
+    larger than ``max_bytes`` is returned but not stored.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Computed outside the lock so other threads can keep reading
+        value = compute()
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._total_bytes += size
+                self._evict()
+        return value
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._total_bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+
+def _estimate_size(value):
+    """Approximate the memory held by a cached stage result in bytes."""
+    if isinstance(value, Image.Image):
+        # Pillow keeps multi-band pixels in 4-byte slots
+        return value.width * value.height * (1 if value.mode in ("1", "L", "P") else 4)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_estimate_size(item) for item in value)
+    return 64
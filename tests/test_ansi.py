@@ -0,0 +1,40 @@
+import re
+import numpy as np
+import pytest
+from ansi import iter_ansi, quantize, render_ansi
+
+ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+def test_render_ansi_coalesces_runs_across_rows():
+    """Test that cells sharing a color share one escape sequence."""
+    glyph_indices = np.array([[0, 1, 2], [2, 1, 0]], dtype=np.uint8)
+    rgb = np.zeros((2, 3, 3), dtype=np.uint8)
+    rgb[1, 1:] = (255, 0, 0)
+    
+    for mode in ("truecolor", "256", "16"):
+        text = render_ansi(glyph_indices, "@#.", rgb, mode)
+        assert ESCAPE.sub("", text) == "@#.\n.#@"
+        # black run spanning the line break, then one red run, then the reset
+        assert len(ESCAPE.findall(text)) == 3
+
+def test_quantize_palettes():
+    """Test nearest-color quantization for the palette modes."""
+    rgb = np.array([[[0, 0, 0], [255, 0, 0], [128, 128, 128], [250, 250, 250]]], dtype=np.uint8)
+    
+    assert quantize(rgb, "256").tolist() == [[16, 196, 244, 231]]
+    assert quantize(rgb, "16").tolist() == [[0, 9, 8, 15]]
+    assert quantize(rgb, "truecolor").tolist() == [[0, 0xFF0000, 0x808080, 0xFAFAFA]]
+    with pytest.raises(ValueError):
+        quantize(rgb, "8")
+
+def test_iter_ansi_chunks_join_to_full_render():
+    """Test that chunked rendering carries colors across chunks and joins to the whole."""
+    rng = np.random.default_rng(3)
+    glyph_indices = rng.integers(0, 3, (7, 5)).astype(np.uint8)
+    # few distinct colors so runs cross row and chunk boundaries
+    rgb = (rng.integers(0, 2, (7, 5, 1)) * 255).repeat(3, axis=2).astype(np.uint8)
+    
+    for mode in ("truecolor", "256", "16"):
+        whole = render_ansi(glyph_indices, "@#.", rgb, mode)
+        for chunk_rows in (1, 2, 3, 7):
+            assert "".join(iter_ansi(glyph_indices, "@#.", rgb, mode, chunk_rows)) == whole
@@ -0,0 +1,55 @@
+import os
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from ascii_canvas import TILE_COLUMNS, TILE_ROWS, AsciiCanvas
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+def _art(rows, columns, seed=0):
+    chars = np.frombuffer(b"@#%*+=-:. ", dtype=np.uint8)
+    grid = chars[np.random.default_rng(seed).integers(0, 10, (rows, columns))]
+    return grid, "\n".join(row.tobytes().decode("ascii") for row in grid)
+
+def test_canvas_paints_only_visible_tiles(app):
+    """Test that a large art only renders the tiles in view and keeps the text."""
+    canvas = AsciiCanvas()
+    canvas.resize(400, 300)
+    grid, text = _art(1000, 2000)
+    canvas.setPlainText(text)
+    canvas.viewport().grab()
+    
+    assert canvas.cell_count() == (1000, 2000)
+    assert canvas.toPlainText() == text
+    assert 0 < len(canvas._tiles) <= 4
+    
+    canvas.verticalScrollBar().setValue(canvas.verticalScrollBar().maximum())
+    canvas.viewport().grab()
+    _, _, last_row, _ = canvas.visible_cells()
+    assert last_row == 999
+    assert (999 // TILE_ROWS, 0) in canvas._tiles
+
+def test_canvas_rerenders_only_changed_tiles(app):
+    """Test that an update invalidates just the tiles with changed cells."""
+    canvas = AsciiCanvas()
+    canvas.resize(800, 600)
+    grid, text = _art(2 * TILE_ROWS, 2 * TILE_COLUMNS)
+    canvas.setPlainText(text)
+    canvas.viewport().grab()
+    assert len(canvas._tiles) == 4
+    
+    grid = grid.copy()
+    grid[TILE_ROWS + 1, 3] = ord("X")
+    canvas.setPlainText("\n".join(row.tobytes().decode("ascii") for row in grid))
+    assert set(canvas._tiles) == {(0, 0), (0, 1), (1, 1)}
+
+def test_canvas_accepts_glyph_indices(app):
+    """Test that converter glyph indices in any charset map onto the canvas."""
+    canvas = AsciiCanvas()
+    indices = np.array([[0, 1], [2, 0]], dtype=np.uint8)
+    canvas.set_cells(indices, "@. ", colors=np.zeros((2, 2, 3), dtype=np.uint8))
+    assert canvas.toPlainText() == "@.\n @"
@@ -2,7 +2,8 @@ import os
 import pytest
 from PIL import Image
 import numpy as np
-from ascii_converter import ASCIIConverter
+from ascii_converter import ASCIIConverter, ConversionCancelled
+from stage_cache import StageCache
 
 def test_ascii_converter_initialization():
     """Test ASCIIConverter initialization with default parameters."""
@@ -57,3 +58,148 @@ def test_image_transformations():
         ascii_art = converter.convert_to_ascii()
         assert isinstance(ascii_art, str)
         assert len(ascii_art.split('\n')) > 0
+
+def test_intensity_map_matches_reference():
+    """Test the vectorized intensity map against the per-pixel reference loop."""
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 255, (37, 53, 3), dtype=np.uint8))
+    
+    for window in (1, 3, 5, 7):
+        fast = ASCIIConverter(None, intensity_window=window)._create_intensity_map(image)
+        reference = ASCIIConverter(None, intensity_window=window, reference=True)._create_intensity_map(image)
+        assert fast.shape == reference.shape
+        assert np.allclose(fast, reference, atol=1e-5)
+
+def test_intensity_window_validation():
+    """Test that even or non-positive window sizes are rejected."""
+    for window in (0, 2, -3):
+        with pytest.raises(ValueError):
+            ASCIIConverter(None, intensity_window=window)
+
+def test_glyph_mapping_matches_reference():
+    """Test that the array-based glyph mapping reproduces the per-pixel output exactly."""
+    test_image_path = 'tests/test_image.png'
+    
+    # Create a test image if it doesn't exist
+    if not os.path.exists(test_image_path):
+        test_image = Image.fromarray(np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8))
+        test_image.save(test_image_path)
+    
+    test_cases = [
+        {"output_width": 80},
+        {"output_width": 37, "density": "fine", "invert": True},
+        {"output_width": 120, "brightness": 1.7, "contrast": 0.4, "density": "coarse"},
+    ]
+    
+    for case in test_cases:
+        fast = ASCIIConverter(test_image_path, **case).convert_to_ascii()
+        reference = ASCIIConverter(test_image_path, reference=True, **case).convert_to_ascii()
+        assert fast == reference
+
+def test_reduced_resolution_decode(tmp_path):
+    """Test that large JPEGs decode at reduced size without changing the output shape."""
+    image_path = os.path.join(str(tmp_path), 'large.jpg')
+    small = Image.fromarray(np.random.randint(0, 255, (30, 40, 3), dtype=np.uint8))
+    small.resize((1600, 1200)).save(image_path)
+    
+    fast = ASCIIConverter(image_path, output_width=50)
+    full = ASCIIConverter(image_path, output_width=50, fast_decode=False)
+    fast_lines = fast.convert_to_ascii().split('\n')
+    full_lines = full.convert_to_ascii().split('\n')
+    
+    assert fast.decode_stats["method"].startswith("draft")
+    assert fast.decode_stats["decoded_bytes"] < full.decode_stats["decoded_bytes"] / 4
+    assert full.decode_stats["method"] == "full"
+    assert [len(line) for line in fast_lines] == [len(line) for line in full_lines]
+
+def test_in_memory_sources_and_convert_many(tmp_path):
+    """Test that paths, encoded bytes, PIL images and arrays convert identically."""
+    pixels = np.random.randint(0, 255, (60, 90, 3), dtype=np.uint8)
+    image_path = os.path.join(str(tmp_path), 'image.png')
+    Image.fromarray(pixels).save(image_path)
+    with open(image_path, 'rb') as file:
+        encoded = file.read()
+    
+    converter = ASCIIConverter(None, output_width=30)
+    expected = converter.convert_to_ascii(image_path)
+    sources = [encoded, Image.fromarray(pixels), pixels, image_path]
+    assert list(converter.convert_many(sources)) == [expected] * len(sources)
+
+def test_preview_shares_decode_and_cancellation(tmp_path):
+    """Test that a preview decoding for the final width shares its decode, and should_stop aborts."""
+    pixels = np.random.randint(0, 255, (300, 400, 3), dtype=np.uint8)
+    cache = StageCache()
+    preview = ASCIIConverter(pixels, output_width=20, decode_width=80, cache=cache)
+    assert len(preview.convert_to_ascii().split('\n')[0]) == 20
+    misses = cache.misses
+    
+    ASCIIConverter(pixels, output_width=80, cache=cache).convert_to_ascii()
+    assert cache.misses == misses + 4  # everything but the decode
+    
+    stages = []
+    def should_stop():
+        stages.append(None)
+        return len(stages) > 2
+    with pytest.raises(ConversionCancelled):
+        ASCIIConverter(pixels, output_width=40, should_stop=should_stop).convert_to_ascii()
+
+def test_convert_widths_from_one_decode(tmp_path):
+    """Test that a width pyramid matches separate conversions and decodes only once."""
+    image_path = os.path.join(str(tmp_path), 'large.png')
+    Image.fromarray(np.random.randint(0, 255, (30, 40, 3), dtype=np.uint8)).resize((1200, 900)).save(image_path)
+    widths = [20, 40, 80]
+    
+    exact = ASCIIConverter(image_path, fast_decode=False).convert_widths(widths)
+    assert list(exact) == [80, 40, 20]
+    for width in widths:
+        assert exact[width] == ASCIIConverter(image_path, output_width=width, fast_decode=False).convert_to_ascii()
+    
+    cache = StageCache()
+    converter = ASCIIConverter(image_path, cache=cache)
+    renditions = converter.convert_widths(widths)
+    assert [level["width"] for level in converter.pyramid_stats["levels"]] == [80, 40, 20]
+    for width in widths:
+        assert renditions[width].shape == ASCIIConverter(image_path, output_width=width).convert().shape
+    # every level after the widest is reduced from the one before instead of decoded
+    sizes = [level["level_size"] for level in converter.pyramid_stats["levels"]]
+    assert sizes[0] == converter.decode_stats["output_size"]
+    assert sizes[1][0] < sizes[0][0] and sizes[2][0] < sizes[1][0]
+    
+    misses = cache.misses
+    ASCIIConverter(image_path, cache=cache).convert_widths(widths)
+    assert cache.misses == misses
+
+def test_tiled_conversion_matches_single_threaded():
+    """Test that splitting the stages over threads gives identical images, maps and text."""
+    pixels = np.random.randint(0, 255, (400, 300, 3), dtype=np.uint8)
+    
+    for params in ({}, {"brightness": 1.3, "contrast": 0.6, "invert": True, "intensity_window": 5},
+                   {"color": "256"}):
+        single = ASCIIConverter(pixels, output_width=300, **params)
+        tiled = ASCIIConverter(pixels, output_width=300, threads=3, **params)
+        image, source_size, _ = single._decode()
+        assert tiled._tile_bands(image.height) is not None
+        
+        single_image, _, _ = single._prepare(image, source_size)
+        tiled_image, _, _ = tiled._prepare(image, source_size)
+        assert np.array_equal(np.asarray(single_image), np.asarray(tiled_image))
+        assert np.array_equal(single._create_intensity_map(single_image), tiled._create_intensity_map(tiled_image))
+        assert tiled.convert_to_ascii() == single.convert_to_ascii()
+    
+    with pytest.raises(ValueError):
+        ASCIIConverter(pixels, threads=0)
+
+def test_tone_table_matches_enhance_chain():
+    """Test that the fused tone pass reproduces the step-by-step adjustment exactly."""
+    image = Image.fromarray(np.random.randint(0, 255, (180, 120, 3), dtype=np.uint8))
+    
+    for params in ({}, {"brightness": 0.6}, {"contrast": 1.7}, {"brightness": 1.4, "contrast": 0.3},
+                   {"brightness": 1.9, "contrast": 2.0, "invert": True}, {"contrast": 0.8, "gamma": 2.2},
+                   {"gamma": 0.5, "invert": True}):
+        for threads in (1, 2):
+            converter = ASCIIConverter(None, threads=threads, **params)
+            assert np.array_equal(np.asarray(converter._adjust_image(image)),
+                                  np.asarray(converter._adjust_image_reference(image)))
+    
+    with pytest.raises(ValueError):
+        ASCIIConverter(None, gamma=0)
@@ -0,0 +1,49 @@
+import io
+from PIL import Image
+import numpy as np
+from ascii_converter import ASCIIConverter
+from ascii_result import AsciiResult
+from result_cache import ResultCache
+
+def test_result_matches_string_conversion():
+    """Test that the compact result renders exactly the text of convert_to_ascii."""
+    pixels = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+    
+    for color in (False, "256"):
+        converter = ASCIIConverter(pixels, output_width=60, color=color)
+        result = converter.convert()
+        text = converter.convert_to_ascii()
+        assert isinstance(result, AsciiResult)
+        assert result.glyph_indices.dtype == np.uint8
+        assert result == text
+        assert "".join(result.iter_chunks(chunk_rows=3)) == text
+        
+        file = io.StringIO()
+        assert result.write(file, chunk_rows=5) == len(text)
+        assert file.getvalue() == text
+
+def test_result_slicing_and_lines():
+    """Test that slices view the same cells and lines carry no breaks."""
+    result = AsciiResult(np.array([[0, 1, 2], [2, 1, 0]], dtype=np.uint8), "@#.")
+    
+    assert str(result) == "@#.\n.#@"
+    assert list(result.iter_lines()) == ["@#.", ".#@"]
+    assert result[1].shape == (1, 3)
+    assert str(result[1]) == ".#@"
+    assert str(result[:, 1:]) == "#.\n#@"
+    assert result.nbytes == 6
+
+def test_write_ascii_streams_through_result_cache(tmp_path):
+    """Test that write_ascii fills the result cache on a miss and copies it out on a hit."""
+    pixels = np.random.randint(0, 255, (60, 90, 3), dtype=np.uint8)
+    image_path = str(tmp_path / "image.png")
+    Image.fromarray(pixels).save(image_path)
+    cache = ResultCache(str(tmp_path / "cache"))
+    expected = ASCIIConverter(image_path, output_width=40).convert_to_ascii()
+    
+    for hits in (0, 1):
+        file = io.StringIO()
+        converter = ASCIIConverter(image_path, output_width=40, result_cache=cache)
+        assert converter.write_ascii(file) == len(expected)
+        assert file.getvalue() == expected
+        assert cache.hits == hits
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+from PIL import Image
+from batch import collect_inputs, run_batch
+
+def _make_tree(root):
+    """Create a small image tree with one unreadable file."""
+    os.makedirs(os.path.join(root, "a", "b"))
+    for name in ("one.png", os.path.join("a", "two.jpg"), os.path.join("a", "b", "three.png")):
+        image = Image.fromarray(np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8))
+        image.save(os.path.join(root, name))
+    with open(os.path.join(root, "a", "broken.png"), "w") as file:
+        file.write("not an image")
+    with open(os.path.join(root, "notes.txt"), "w") as file:
+        file.write("skipped")
+
+def test_collect_inputs_mirrors_directories_and_globs(tmp_path):
+    """Test that directories and globs expand to image files with mirrored relative paths."""
+    _make_tree(str(tmp_path))
+    
+    inputs = collect_inputs([str(tmp_path)])
+    assert sorted(rel for _, rel in inputs) == sorted([
+        "one.png", os.path.join("a", "two.jpg"), os.path.join("a", "broken.png"),
+        os.path.join("a", "b", "three.png"),
+    ])
+    
+    inputs = collect_inputs([os.path.join(str(tmp_path), "a", "**", "*.png")])
+    assert sorted(rel for _, rel in inputs) == sorted(["broken.png", os.path.join("b", "three.png")])
+
+def test_run_batch_reports_failures_without_stopping(tmp_path):
+    """Test that a bad image is reported while the others are still converted."""
+    source = str(tmp_path / "in")
+    output = str(tmp_path / "out")
+    _make_tree(source)
+    
+    summary = run_batch(collect_inputs([source]), output, jobs=2, output_width=30)
+    
+    assert summary["converted"] == 3
+    assert [os.path.basename(path) for path, _ in summary["failed"]] == ["broken.png"]
+    with open(os.path.join(output, "a", "b", "three.png.txt")) as file:
+        assert len(file.read().split("\n")[0]) == 30
+
+def test_run_batch_keeps_same_named_inputs_apart(tmp_path):
+    """Test that same-named files from several specs or with other extensions get their own outputs."""
+    for directory, name in (("dirA", "x.png"), ("dirB", "x.png"), ("dirB", "x.jpg")):
+        os.makedirs(str(tmp_path / directory), exist_ok=True)
+        Image.fromarray(np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)).save(str(tmp_path / directory / name))
+    output = str(tmp_path / "out")
+    inputs = collect_inputs([str(tmp_path / "dirA"), str(tmp_path / "dirB")])
+    assert sorted(rel for _, rel in inputs) == sorted([
+        os.path.join("dirA", "x.png"), os.path.join("dirB", "x.jpg"), os.path.join("dirB", "x.png"),
+    ])
+    
+    summary = run_batch(inputs, output, jobs=2, output_width=20)
+    
+    assert summary["converted"] == 3
+    assert sorted(os.listdir(os.path.join(output, "dirB"))) == ["x.jpg.txt", "x.png.txt"]
+    assert os.listdir(os.path.join(output, "dirA")) == ["x.png.txt"]
+
+def test_run_batch_fails_inputs_with_colliding_outputs(tmp_path):
+    """Test that inputs still mapping to one output file fail instead of overwriting each other."""
+    for directory in ("a", "b"):
+        os.makedirs(str(tmp_path / directory / "photos"))
+        Image.fromarray(np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)).save(
+            str(tmp_path / directory / "photos" / "x.png"))
+    output = str(tmp_path / "out")
+    inputs = collect_inputs([str(tmp_path / "a" / "photos"), str(tmp_path / "b" / "photos")])
+    
+    summary = run_batch(inputs, output, jobs=2, output_width=20)
+    
+    assert summary["converted"] == 1
+    assert len(summary["failed"]) == 1
+    assert "already written" in summary["failed"][0][1]
+    assert os.listdir(os.path.join(output, "photos")) == ["x.png.txt"]
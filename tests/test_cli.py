@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_cli_entry_point_does_not_load_gui(tmp_path):
+    """Test that a command-line conversion through main.py never imports PyQt5."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (30, 40, 3), dtype=np.uint8)).save(image_path)
+    code = ("import runpy, sys; "
+            f"sys.argv = ['main.py', {image_path!r}, '-w', '20']; "
+            "runpy.run_path('main.py', run_name='__main__'); "
+            "sys.stderr.write(repr(sorted(name for name in ('PyQt5', 'gui') if name in sys.modules)))")
+    env = dict(os.environ, ARTASCII_CACHE_DIR=os.path.join(str(tmp_path), "cache"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, env=env)
+    
+    assert result.returncode == 0
+    assert len(result.stdout.split("\n")[0]) == 20
+    assert result.stderr.endswith("[]")
+
+def test_cli_reuses_cached_result(tmp_path):
+    """Test that a repeated CLI conversion is served from the result cache."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (30, 40, 3), dtype=np.uint8)).save(image_path)
+    command = [sys.executable, "cli.py", image_path, "-w", "20", "--stats",
+               "--cache-dir", os.path.join(str(tmp_path), "cache")]
+    
+    first = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    second = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    assert "Result cache miss" in first.stderr
+    assert "Result cache hit" in second.stderr
+    assert "Decoded" not in second.stderr
+    assert first.stdout == second.stdout
+
+def test_cli_frames_mode_applies_filters(tmp_path):
+    """Test that --frames converts every frame with the --filter stack and --threads."""
+    from ascii_converter import ASCIIConverter
+    from frames import iter_frames
+    
+    sequence_dir = os.path.join(str(tmp_path), "frames")
+    os.makedirs(sequence_dir)
+    for i in range(2):
+        Image.fromarray(np.random.default_rng(i).integers(0, 255, (30, 40, 3), dtype=np.uint8)).save(
+            os.path.join(sequence_dir, f"frame_{i}.png"))
+    output_dir = os.path.join(str(tmp_path), "out")
+    command = [sys.executable, "cli.py", sequence_dir, "--frames", "--output-dir", output_dir,
+               "-w", "20", "--filter", "emboss", "--threads", "2"]
+    result = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    
+    filtered = ASCIIConverter(None, output_width=20, filters=("emboss",))
+    plain = ASCIIConverter(None, output_width=20)
+    for index, frame in enumerate(iter_frames(sequence_dir), start=1):
+        with open(os.path.join(output_dir, f"frame_{index:05d}.txt")) as file:
+            written = file.read()
+        assert written == filtered._convert(frame)
+        assert written != plain._convert(frame)
+
+def test_cli_rejects_non_positive_threads():
+    """Test that --threads below 1 is a usage error rather than a traceback."""
+    for value in ("0", "-2", "two"):
+        result = subprocess.run([sys.executable, "cli.py", "image.png", "--threads", value],
+                                cwd=REPO_ROOT, capture_output=True, text=True)
+        assert result.returncode == 2
+        assert "--threads" in result.stderr
+        assert "Traceback" not in result.stderr
+
+def test_cli_image_mode_renders_and_reports_errors(tmp_path):
+    """Test that --image writes a bitmap and that an unreadable input is reported without a traceback."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (30, 40, 3), dtype=np.uint8)).save(image_path)
+    bitmap_path = os.path.join(str(tmp_path), "art.png")
+    result = subprocess.run([sys.executable, "cli.py", image_path, "-w", "20", "--color", "truecolor",
+                             "--image", bitmap_path], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    with Image.open(bitmap_path) as bitmap:
+        assert bitmap.mode == "RGB" and bitmap.width > 20
+    
+    broken_path = os.path.join(str(tmp_path), "broken.png")
+    with open(broken_path, "w") as file:
+        file.write("not an image")
+    result = subprocess.run([sys.executable, "cli.py", broken_path, "--image", bitmap_path],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stderr.startswith("Error converting image:")
+    assert "Traceback" not in result.stderr
+
+def test_cli_exits_quietly_when_stdout_is_closed(tmp_path):
+    """Test that a reader closing the pipe early (``| head``) gets no error message."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (300, 400, 3), dtype=np.uint8)).save(image_path)
+    process = subprocess.Popen([sys.executable, "cli.py", image_path, "-w", "2000", "--no-cache"], cwd=REPO_ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.readline()
+    process.stdout.close()
+    stderr = process.stderr.read().decode()
+    process.stderr.close()
+    
+    assert process.wait(timeout=60) == 1
+    assert stderr == ""
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from ascii_converter import ASCIIConverter
+from filter_stack import FILTERS, FilterStack
+from stage_cache import StageCache
+
+def test_filter_stack_undo_redo():
+    """Test pushing, undoing and redoing filters, and that a push drops the redo history."""
+    stack = FilterStack()
+    assert not stack.can_undo() and stack.undo() is None
+    
+    stack.push("blur")
+    stack.push("contour")
+    assert stack.filters == ("blur", "contour")
+    assert stack.undo() == "contour"
+    assert stack.filters == ("blur",) and stack.can_redo()
+    assert stack.redo() == "contour"
+    assert stack.filters == ("blur", "contour") and not stack.can_redo()
+    
+    stack.undo()
+    stack.push("sharpen")
+    assert stack.filters == ("blur", "sharpen") and not stack.can_redo()
+    with pytest.raises(ValueError):
+        stack.push("posterize")
+
+def test_filters_are_cached_per_stack_prefix():
+    """Test that adding or removing the top filter recomputes only that filter and later stages."""
+    pixels = np.random.randint(0, 255, (90, 120, 3), dtype=np.uint8)
+    cache = StageCache()
+    
+    ASCIIConverter(pixels, output_width=60, filters=("blur", "sharpen"), cache=cache).convert_to_ascii()
+    misses = cache.misses
+    # the contour filter, edge, adjust and glyph stages
+    ASCIIConverter(pixels, output_width=60, filters=("blur", "sharpen", "contour"), cache=cache).convert_to_ascii()
+    assert cache.misses == misses + 4
+    misses = cache.misses
+    ASCIIConverter(pixels, output_width=60, filters=("blur", "sharpen"), cache=cache).convert_to_ascii()
+    assert cache.misses == misses
+    
+    unfiltered = ASCIIConverter(pixels, output_width=60).convert_to_ascii()
+    assert ASCIIConverter(pixels, output_width=60, filters=("find_edges",)).convert_to_ascii() != unfiltered
+    with pytest.raises(ValueError):
+        ASCIIConverter(pixels, filters=("posterize",))
+
+def test_tiled_filters_match_single_threaded():
+    """Test that every filter gives the same image when split over threads."""
+    pixels = np.random.randint(0, 255, (400, 300, 3), dtype=np.uint8)
+    
+    for name in FILTERS:
+        single = ASCIIConverter(pixels, output_width=300, filters=(name,))
+        tiled = ASCIIConverter(pixels, output_width=300, filters=(name,), threads=3)
+        image, source_size, _ = single._decode()
+        assert np.array_equal(np.asarray(single._resize_and_adjust(image, source_size)[0]),
+                              np.asarray(tiled._resize_and_adjust(image, source_size)[0]))
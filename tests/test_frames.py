@@ -0,0 +1,40 @@
+import io
+import os
+import numpy as np
+from PIL import Image
+from ascii_converter import ASCIIConverter
+from frames import iter_frames, play_frames, write_frames
+
+def _make_gif(path, count):
+    """Save an animated GIF with ``count`` distinct frames."""
+    frames = [Image.fromarray(np.full((40, 60, 3), i * 20, dtype=np.uint8)) for i in range(count)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=50)
+
+def test_iter_frames_reads_every_gif_frame_and_sequences(tmp_path):
+    """Test that animated files and numbered sequences yield every frame in order."""
+    gif_path = os.path.join(str(tmp_path), "clip.gif")
+    _make_gif(gif_path, 5)
+    assert len(list(iter_frames(gif_path))) == 5
+    
+    sequence_dir = os.path.join(str(tmp_path), "sequence")
+    os.makedirs(sequence_dir)
+    for i in (1, 2, 10):
+        Image.fromarray(np.full((10, 10, 3), i, dtype=np.uint8)).save(os.path.join(sequence_dir, f"f{i}.png"))
+    values = [frame.getpixel((0, 0))[0] for frame in iter_frames(sequence_dir)]
+    assert values == [1, 2, 10]
+
+def test_write_and_play_frames(tmp_path):
+    """Test frame-file output and playback accounting."""
+    gif_path = os.path.join(str(tmp_path), "clip.gif")
+    _make_gif(gif_path, 4)
+    converter = ASCIIConverter(None, output_width=20)
+    
+    summary = write_frames(gif_path, converter, os.path.join(str(tmp_path), "out"), prefetch=2)
+    assert summary["frames"] == 4
+    assert sorted(os.listdir(os.path.join(str(tmp_path), "out")))[0] == "frame_00001.txt"
+    
+    out = io.StringIO()
+    summary = play_frames(gif_path, converter, fps=200, out=out)
+    assert summary["frames"] == 4
+    assert summary["shown"] + summary["dropped"] == 4
+    assert out.getvalue().count("\x1b[H") == summary["shown"]
@@ -0,0 +1,50 @@
+import os
+import numpy as np
+from PIL import Image
+import glyph_matching
+from ascii_converter import ASCIIConverter
+from glyph_matching import SHAPE_CHARSET, GlyphMatcher, load_glyph_features
+
+def test_feature_matrix_is_cached_on_disk(tmp_path, monkeypatch):
+    """Test that the glyph feature matrix is computed once and then read from disk."""
+    features = load_glyph_features(cache_dir=str(tmp_path))
+    assert features.shape == (len(SHAPE_CHARSET), 8)
+    assert len(os.listdir(os.path.join(str(tmp_path), "glyph_features"))) == 1
+    
+    def fail(*args):
+        raise AssertionError("recomputed")
+    monkeypatch.setattr(glyph_matching, "glyph_features", fail)
+    assert np.array_equal(load_glyph_features(cache_dir=str(tmp_path)), features)
+
+def test_matcher_follows_block_shape(tmp_path):
+    """Test that blank, solid and half-inked blocks pick fitting glyphs."""
+    matcher = GlyphMatcher(cache_dir=str(tmp_path))
+    gray = np.full((4, 8), 255, dtype=np.uint8)
+    gray[:, 2:4] = 0          # solid cell
+    gray[:2, 4:6] = 0         # ink in the top half only
+    gray[2:, 6:8] = 0         # ink in the bottom half only
+    blank, solid, top, bottom = matcher.match(gray)[0]
+    
+    assert SHAPE_CHARSET[blank] == " "
+    assert SHAPE_CHARSET[solid] not in " .,'`-"
+    # Feature rows run top to bottom, two sub-cells per row
+    features = load_glyph_features(cache_dir=str(tmp_path))
+    assert features[top, :4].sum() > features[top, 4:].sum()
+    assert features[bottom, 4:].sum() > features[bottom, :4].sum()
+
+def test_converter_shape_mode(tmp_path, monkeypatch):
+    """Test output shape, colors and that the settings select the mode."""
+    # The shared matcher caches its features under $ARTASCII_CACHE_DIR, never in the home directory
+    monkeypatch.setenv("ARTASCII_CACHE_DIR", str(tmp_path))
+    glyph_matching.get_matcher.cache_clear()
+    image = Image.fromarray(np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8))
+    luminance = ASCIIConverter(image, output_width=40).convert_to_ascii()
+    shape = ASCIIConverter(image, output_width=40, glyph_mode="shape").convert_to_ascii()
+    assert [len(line) for line in shape.split("\n")] == [len(line) for line in luminance.split("\n")]
+    
+    converter = ASCIIConverter(image, output_width=40, glyph_mode="shape", color="truecolor")
+    glyph_indices, colors = converter._convert_cells()
+    assert glyph_indices.shape == colors.shape[:2]
+    assert "\x1b[38;2;" in converter.convert_to_ascii()
+    assert os.listdir(os.path.join(str(tmp_path), "glyph_features"))
+    glyph_matching.get_matcher.cache_clear()
@@ -0,0 +1,139 @@
+import os
+import numpy as np
+import pytest
+from PIL import Image
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+from PyQt5 import QtTest
+import gui
+from ascii_converter import ASCIIConverter
+from gui import PREVIEW_WIDTH, ArtASCIIStudio, ConversionTask, load_thumbnail, progressive_widths
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+@pytest.fixture
+def window(app, tmp_path, monkeypatch):
+    # Keep the window's result cache out of the home directory
+    monkeypatch.setenv("ARTASCII_CACHE_DIR", str(tmp_path / "cache"))
+    window = ArtASCIIStudio()
+    window.current_image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (60, 80, 3), dtype=np.uint8)).save(
+        window.current_image_path)
+    yield window
+    window.conversion_pool.waitForDone()
+    window.close()
+
+def _settle(app, window):
+    """Let the debounce timer fire, the conversions finish and their signals arrive."""
+    QtTest.QTest.qWait(3 * window.UPDATE_DELAY_MS)
+    window.conversion_pool.waitForDone()
+    app.processEvents()
+
+def _record_tasks(monkeypatch):
+    started = []
+    class RecordingTask(ConversionTask):
+        def __init__(self, *args):
+            super().__init__(*args)
+            started.append(self)
+    monkeypatch.setattr(gui, "ConversionTask", RecordingTask)
+    return started
+
+def test_thumbnail_orientation_matches_the_art(app, tmp_path):
+    """Test that the preview ignores EXIF rotation just as the converter does."""
+    image_path = os.path.join(str(tmp_path), "rotated.jpg")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise to display
+    Image.fromarray(np.zeros((40, 80, 3), dtype=np.uint8)).save(image_path, exif=exif)
+    
+    pixmap = load_thumbnail(image_path, 400)
+    assert pixmap.width() > pixmap.height()
+    lines = ASCIIConverter(image_path, output_width=40).convert_to_ascii().split("\n")
+    assert len(lines[0]) == 40 and len(lines) < 40
+
+def test_slider_burst_runs_one_conversion(app, window, monkeypatch):
+    """Test that a burst of slider changes is debounced into a single conversion."""
+    started = _record_tasks(monkeypatch)
+    window.width_spinbox.setValue(60)
+    for value in range(50, 151, 10):
+        window.brightness_slider.setValue(value)
+    assert started == []
+    
+    _settle(app, window)
+    
+    assert len(started) == 1
+    assert started[0].converter_kwargs["brightness"] == 1.5
+    expected = ASCIIConverter(window.current_image_path, output_width=60, brightness=1.5).convert_to_ascii()
+    assert window.ascii_display.toPlainText() == expected
+
+def test_stale_generations_are_never_displayed(app, window, monkeypatch):
+    """Test that results of superseded conversions never reach the display."""
+    displayed = []
+    set_plain_text = window.ascii_display.setPlainText
+    monkeypatch.setattr(window.ascii_display, "setPlainText",
+                        lambda text: (displayed.append(text), set_plain_text(text)))
+    window.width_spinbox.setValue(60)
+    window.update_timer.stop()
+    window.brightness_slider.setValue(50)
+    window.update_ascii_art()
+    stale_generation = window.conversion_generation
+    window.brightness_slider.setValue(150)
+    window.update_ascii_art()
+    
+    _settle(app, window)
+    window.show_ascii_art(stale_generation, "stale", True)
+    
+    expected = ASCIIConverter(window.current_image_path, output_width=60, brightness=1.5).convert_to_ascii()
+    assert displayed == [expected]
+
+def test_superseded_task_stops_without_emitting(app, tmp_path):
+    """Test that a task whose generation is no longer current is cancelled and emits nothing."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.zeros((60, 80, 3), dtype=np.uint8)).save(image_path)
+    task = ConversionTask(1, lambda generation: False, dict(image_path=image_path), [40, 200])
+    emitted = []
+    task.signals.finished.connect(lambda *args: emitted.append(args))
+    
+    task.run()
+    app.processEvents()
+    
+    assert emitted == []
+
+def test_progressive_widths_go_from_preview_to_final():
+    """Test that passes start at the preview width, grow by 4x and end at the requested width."""
+    assert progressive_widths(60) == [60]
+    assert progressive_widths(2 * PREVIEW_WIDTH) == [PREVIEW_WIDTH, 2 * PREVIEW_WIDTH]
+    assert progressive_widths(1000) == [PREVIEW_WIDTH, 4 * PREVIEW_WIDTH, 1000]
+    assert progressive_widths(2000) == [PREVIEW_WIDTH, 4 * PREVIEW_WIDTH, 16 * PREVIEW_WIDTH, 2000]
+
+def test_task_emits_coarse_passes_then_the_final_one(app, tmp_path):
+    """Test that each pass is emitted at its width and only the last is marked final."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)).save(image_path)
+    task = ConversionTask(1, lambda generation: True, dict(image_path=image_path), [40, 160, 400])
+    emitted = []
+    task.signals.finished.connect(lambda generation, art, final: emitted.append((len(art.split("\n")[0]), final)))
+    
+    task.run()
+    app.processEvents()
+    
+    assert emitted == [(40, False), (160, False), (400, True)]
+
+def test_only_the_final_pass_stays_on_screen(app, window, monkeypatch):
+    """Test that previews are replaced by the full-width art and the busy bar goes away."""
+    displayed = []
+    set_plain_text = window.ascii_display.setPlainText
+    monkeypatch.setattr(window.ascii_display, "setPlainText",
+                        lambda text: (displayed.append(text), set_plain_text(text)))
+    window.width_spinbox.setValue(400)
+    window.update_timer.stop()
+    window.update_ascii_art()
+    
+    _settle(app, window)
+    
+    assert [len(text.split("\n")[0]) for text in displayed] == [40, 160, 400]
+    expected = ASCIIConverter(window.current_image_path, output_width=400).convert_to_ascii()
+    assert window.ascii_display.toPlainText() == expected
+    assert window.progress_bar.isHidden()
@@ -0,0 +1,33 @@
+import json
+import os
+import numpy as np
+from PIL import Image
+import instrumentation
+from ascii_converter import ASCIIConverter
+
+def test_instrumentation_is_off_by_default_and_records_when_enabled(tmp_path):
+    """Test that stages are only recorded while instrumentation is enabled."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)).save(image_path)
+    instrumentation.reset()
+    
+    ASCIIConverter(image_path, output_width=40).convert_to_ascii()
+    assert instrumentation.summary()["spans"] == {}
+    
+    instrumentation.enable()
+    try:
+        ASCIIConverter(image_path, output_width=40).convert_to_ascii()
+    finally:
+        instrumentation.disable()
+    
+    data = instrumentation.summary()
+    assert set(data["spans"]) == {"decode", "resize", "edge", "adjust", "glyph_map"}
+    assert data["counters"]["conversions"] == 1
+    assert data["counters"]["pixels_mapped"] == 40 * int(40 * 60 / 80 * 0.55)
+    
+    trace_path = os.path.join(str(tmp_path), "trace.json")
+    instrumentation.export_trace(trace_path)
+    with open(trace_path) as file:
+        events = json.load(file)["traceEvents"]
+    assert sum(event["ph"] == "X" for event in events) == 5
+    instrumentation.reset()
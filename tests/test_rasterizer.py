@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from rasterizer import get_atlas, rasterize, render_text
+
+def test_rasterize_tiles_atlas_glyphs():
+    """Test that the bitmap is sized to the cells and built from the atlas masks."""
+    atlas = get_atlas("@#. ")
+    glyph_indices = np.array([[0, 1, 2], [3, 0, 1]], dtype=np.uint8)
+    
+    image = rasterize(glyph_indices, atlas, foreground=(255, 255, 255), background=(0, 0, 0))
+    assert image.size == (3 * atlas.cell_width, 2 * atlas.cell_height)
+    
+    pixels = np.asarray(image.convert("L"))
+    cell = pixels[atlas.cell_height:, atlas.cell_width:2 * atlas.cell_width]
+    assert np.array_equal(cell, atlas.masks[0])
+
+def test_rasterize_colors_cells_and_pads_text():
+    """Test per-cell ink colors and ragged text lines."""
+    atlas = get_atlas("@ ")
+    colors = np.array([[[255, 0, 0], [0, 0, 255]]], dtype=np.uint8)
+    
+    image = rasterize(np.array([[0, 0]], dtype=np.uint8), atlas, colors=colors, background=(0, 0, 0))
+    pixels = np.asarray(image)
+    left, right = pixels[:, :atlas.cell_width], pixels[:, atlas.cell_width:]
+    assert left[..., 0].max() > 0 and left[..., 2].max() == 0
+    assert right[..., 2].max() > 0 and right[..., 0].max() == 0
+    
+    image = render_text("@@@\n@")
+    atlas = get_atlas(" ?@")
+    assert image.size == (3 * atlas.cell_width, 2 * atlas.cell_height)
+
+def test_render_text_exports_empty_art_as_a_blank_cell(tmp_path):
+    """Test that empty art still renders to an image that can be saved."""
+    image = render_text("")
+    atlas = get_atlas(" ?")
+    assert image.size == (atlas.cell_width, atlas.cell_height)
+    assert np.asarray(image).min() == 255
+    image.save(str(tmp_path / "empty.png"))
+
+def test_atlas_scales_fixed_size_fallback_font(monkeypatch):
+    """Test that the size still sets the cell size when only the bitmap font is available."""
+    import rasterizer
+    from PIL import ImageFont
+    if not hasattr(ImageFont, "load_default_imagefont"):
+        pytest.skip("Pillow without load_default_imagefont")
+    monkeypatch.setattr(rasterizer, "load_font", lambda font_path, size: ImageFont.load_default_imagefont())
+    
+    small = rasterizer.get_atlas.__wrapped__("@ ", size=rasterizer.BITMAP_FONT_SIZE)
+    large = rasterizer.get_atlas.__wrapped__("@ ", size=2 * rasterizer.BITMAP_FONT_SIZE)
+    assert (large.cell_width, large.cell_height) == (2 * small.cell_width, 2 * small.cell_height)
+    assert large.masks.shape == (2, large.cell_height, large.cell_width)
+    assert large.masks[0].max() > 0 and large.masks[1].max() == 0
@@ -0,0 +1,77 @@
+import os
+import numpy as np
+from PIL import Image
+from ascii_converter import ASCIIConverter
+from result_cache import ResultCache, file_digest
+
+def test_result_cache_round_trip_and_lru_eviction(tmp_path):
+    """Test storing, reading and evicting least recently used entries."""
+    cache = ResultCache(str(tmp_path), max_bytes=2500)
+    keys = [ResultCache.key(b"image", {"output_width": width}) for width in range(3)]
+    assert len(set(keys)) == 3
+    
+    cache.put(keys[0], "a" * 1000)
+    cache.put(keys[1], "b" * 1000)
+    os.utime(cache._path(keys[0]), (1, 1))
+    os.utime(cache._path(keys[1]), (2, 2))
+    assert cache.get(keys[0]) == "a" * 1000  # refreshes keys[0]
+    cache.put(keys[2], "c" * 1000)
+    
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "a" * 1000
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 2)
+    assert stats["bytes"] <= 2500
+
+def test_converter_skips_decode_on_hit(tmp_path):
+    """Test that a hit returns the same art without decoding, and settings change the key."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)).save(image_path)
+    cache = ResultCache(os.path.join(str(tmp_path), "cache"))
+    
+    first = ASCIIConverter(image_path, output_width=40, result_cache=cache)
+    expected = first.convert_to_ascii()
+    assert first.decode_stats is not None
+    
+    second = ASCIIConverter(image_path, output_width=40, result_cache=cache)
+    assert second.convert_to_ascii() == expected
+    assert second.decode_stats is None
+    with open(image_path, "rb") as file:
+        assert second.convert_to_ascii(file.read()) == expected
+    
+    ASCIIConverter(image_path, output_width=40, invert=True, result_cache=cache).convert_to_ascii()
+    assert (cache.hits, cache.misses) == (2, 2)
+
+def test_file_digest_is_remembered_until_the_file_changes(tmp_path, monkeypatch):
+    """Test that a file is hashed once per content version, not on every lookup."""
+    path = str(tmp_path / "image.png")
+    with open(path, "wb") as file:
+        file.write(b"first")
+    reads = []
+    real_open = open
+    def counting_open(name, *args, **kwargs):
+        if name == path:
+            reads.append(name)
+        return real_open(name, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", counting_open)
+    
+    first = file_digest(path)
+    assert file_digest(path) == first
+    assert len(reads) == 1
+    
+    with real_open(path, "wb") as file:
+        file.write(b"second, longer")
+    assert file_digest(path) != first
+    assert len(reads) == 2
+
+def test_result_cache_serves_hits_when_utime_fails(tmp_path, monkeypatch):
+    """Test that a cache whose entries cannot be touched still returns them."""
+    cache = ResultCache(str(tmp_path))
+    key = ResultCache.key(b"image", {})
+    cache.put(key, "art")
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+    monkeypatch.setattr(os, "utime", read_only)
+    
+    assert cache.get(key) == "art"
+    assert (cache.hits, cache.misses) == (1, 0)
@@ -0,0 +1,161 @@
+import asyncio
+import io
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from PIL import Image
+from server import ConversionService, parse_params
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (60, 80, 3), dtype=np.uint8)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def test_parse_params_validates_options():
+    """Test query parsing into converter options and rejection of bad values."""
+    params = parse_params("width=80&density=fine&invert=true&color=256")
+    assert params["output_width"] == 80
+    assert params["density"] == "fine"
+    assert params["invert"] is True
+    assert params["color"] == "256"
+    assert parse_params("")["color"] is False
+    for query in ("width=0", "density=huge", "color=8", "bogus=1", "width=abc"):
+        with pytest.raises(ValueError):
+            parse_params(query)
+
+def test_identical_requests_are_coalesced_and_overflow_rejected():
+    """Test that concurrent identical requests share one job and the queue limit is enforced."""
+    data = _jpeg_bytes()
+    params = parse_params("width=40")
+    
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            service = ConversionService(executor=executor, max_queue=1)
+            first, second = await asyncio.gather(service.convert(data, params), service.convert(data, params))
+            assert first == second
+            assert service.metrics()["coalesced"] == 1
+            
+            pending = asyncio.ensure_future(service.convert(data, params))
+            await asyncio.sleep(0)
+            with pytest.raises(ConversionService.QueueFull):
+                await service.convert(data, parse_params("width=41"))
+            await pending
+            assert service.metrics()["rejected"] == 1
+    
+    asyncio.run(scenario())
+
+def test_http_round_trip():
+    """Test POST /convert and GET /metrics over a real socket."""
+    data = _jpeg_bytes()
+    
+    async def fetch(port, head, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+    
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            service = ConversionService(executor=executor)
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                response = await fetch(port, f"POST /convert?width=30 HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n", data)
+                assert response.startswith(b"HTTP/1.1 200")
+                assert len(response.split(b"\r\n\r\n", 1)[1].split(b"\n")[0]) == 30
+                
+                response = await fetch(port, "POST /convert?width=-1 HTTP/1.1\r\nContent-Length: 0\r\n\r\n")
+                assert response.startswith(b"HTTP/1.1 400")
+                
+                response = await fetch(port, "POST /convert HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+                assert response.startswith(b"HTTP/1.1 400")
+                
+                response = await fetch(port, "GET /metrics HTTP/1.1\r\n\r\n")
+                assert b'"requests": 1' in response
+    
+    asyncio.run(scenario())
+
+def test_unexpected_handler_errors_answer_500():
+    """Test that an error escaping the request handler still answers and closes the connection."""
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            service = ConversionService(executor=executor)
+            async def broken(reader):
+                await reader.readuntil(b"\r\n\r\n")
+                raise RuntimeError("boom")
+            service._handle_request = broken
+            server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /health HTTP/1.1\r\n\r\n")
+                await writer.drain()
+                response = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                assert response.startswith(b"HTTP/1.1 500")
+    
+    asyncio.run(scenario())
+
+def test_worker_converter_is_reused_per_parameter_set(monkeypatch):
+    """Test that pool processes reuse converters and bound how many they keep."""
+    import server
+    monkeypatch.setattr(server, "_worker_converters", {})
+    
+    first = server.worker_converter({"output_width": 20, "density": "fine"})
+    assert server.worker_converter({"density": "fine", "output_width": 20}) is first
+    for width in range(1, server.MAX_WORKER_CONVERTERS + 1):
+        server.worker_converter({"output_width": width})
+    assert len(server._worker_converters) <= server.MAX_WORKER_CONVERTERS
+    assert server.worker_converter({"output_width": 20, "density": "fine"}) is not first
+
+def _children(pid):
+    """PIDs whose parent is ``pid``, read from /proc."""
+    children = []
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            try:
+                with open(f"/proc/{name}/stat") as file:
+                    fields = file.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == pid:
+                children.append(int(name))
+    return children
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc to list child processes")
+def test_sigterm_shuts_the_worker_pool_down():
+    """Test that terminating the service leaves none of its pool processes behind."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    service = subprocess.Popen([sys.executable, "cli.py", "--serve", "--port", str(port), "--jobs", "1"],
+                               cwd=REPO_ROOT, stderr=subprocess.PIPE)
+    try:
+        service.stderr.readline()  # the "Serving on" banner
+        data = _jpeg_bytes()
+        with socket.create_connection(("127.0.0.1", port)) as connection:
+            connection.sendall(f"POST /convert?width=20 HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n"
+                               .encode("latin-1") + data)
+            assert connection.makefile("rb").readline().startswith(b"HTTP/1.1 200")
+        children = _children(service.pid)
+        assert children
+        
+        service.terminate()
+        assert service.wait(timeout=30) == 0
+    finally:
+        if service.poll() is None:
+            service.kill()
+            service.wait()
+    deadline = time.time() + 10
+    while any(os.path.exists(f"/proc/{pid}") for pid in children) and time.time() < deadline:
+        time.sleep(0.1)
+    assert not any(os.path.exists(f"/proc/{pid}") for pid in children)
@@ -0,0 +1,48 @@
+import os
+import numpy as np
+from PIL import Image
+from ascii_converter import ASCIIConverter
+from stage_cache import StageCache
+
+def test_stage_cache_evicts_least_recently_used():
+    """Test entry and byte limits with LRU eviction."""
+    cache = StageCache(max_bytes=1000, max_entries=2)
+    cache.get_or_compute(("a",), lambda: "x" * 100)
+    cache.get_or_compute(("b",), lambda: "y" * 100)
+    cache.get_or_compute(("a",), lambda: "unused")
+    cache.get_or_compute(("c",), lambda: "z" * 100)
+    
+    assert len(cache) == 2
+    assert cache.get_or_compute(("a",), lambda: "recomputed") == "x" * 100
+    assert cache.get_or_compute(("b",), lambda: "recomputed") == "recomputed"
+    
+    # Results larger than the byte budget are returned but never stored
+    cache.get_or_compute(("big",), lambda: np.zeros(2000, dtype=np.uint8))
+    assert cache.total_bytes <= 1000
+
+def test_converter_recomputes_only_downstream_stages(tmp_path):
+    """Test that changing a late-stage parameter reuses the earlier stages."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    Image.fromarray(np.random.randint(0, 255, (60, 80, 3), dtype=np.uint8)).save(image_path)
+    cache = StageCache()
+    
+    first = ASCIIConverter(image_path, output_width=40, cache=cache).convert_to_ascii()
+    assert cache.misses == 5
+    
+    # Only the glyph stage depends on detail preservation
+    ASCIIConverter(image_path, output_width=40, detail_preservation=0.2, cache=cache).convert_to_ascii()
+    assert cache.misses == 6
+    
+    # Brightness invalidates the adjust and glyph stages but not the edge filter
+    ASCIIConverter(image_path, output_width=40, brightness=1.3, cache=cache).convert_to_ascii()
+    assert cache.misses == 8
+    
+    # Contrast needs the mean gray of the brightened image once per brightness
+    ASCIIConverter(image_path, output_width=40, brightness=1.3, contrast=0.5, cache=cache).convert_to_ascii()
+    assert cache.misses == 11
+    ASCIIConverter(image_path, output_width=40, brightness=1.3, contrast=0.8, gamma=1.4,
+                   cache=cache).convert_to_ascii()
+    assert cache.misses == 13
+    
+    assert ASCIIConverter(image_path, output_width=40, cache=cache).convert_to_ascii() == first
+    assert cache.misses == 13
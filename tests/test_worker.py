@@ -0,0 +1,77 @@
+import base64
+import io
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from ascii_converter import ASCIIConverter
+from worker import Worker
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (60, 80, 3), dtype=np.uint8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_worker_answers_every_job_by_id():
+    """Test that paths, base64 images and bad jobs each get one tagged response with timings."""
+    data = _png_bytes()
+    lines = [
+        json.dumps({"id": "a", "image": base64.b64encode(data).decode(), "params": {"output_width": 30}}),
+        json.dumps({"id": "b", "path": "/nonexistent/image.png"}),
+        json.dumps({"id": "c", "image": base64.b64encode(data).decode(), "params": {"bogus": 1}}),
+        "not json",
+        "",
+    ]
+    output = io.StringIO()
+    worker = Worker(output, executor=ThreadPoolExecutor(2), max_pending=2)
+    worker.run(lines)
+    
+    responses = {response["id"]: response for response in map(json.loads, output.getvalue().splitlines())}
+    assert set(responses) == {"a", "b", "c", None}
+    assert responses["a"]["ok"]
+    assert responses["a"]["ascii"] == ASCIIConverter(data, output_width=30).convert_to_ascii()
+    assert {"queued_ms", "convert_ms", "total_ms"} <= set(responses["a"]["timing"])
+    assert not responses["b"]["ok"] and "FileNotFoundError" in responses["b"]["error"]
+    assert "bogus" in responses["c"]["error"]
+    assert not responses[None]["ok"]
+    assert (worker.completed, worker.failed) == (1, 3)
+
+def test_cli_worker_mode(tmp_path):
+    """Test the NDJSON worker end to end over stdin and stdout with a process pool."""
+    image_path = os.path.join(str(tmp_path), "image.png")
+    with open(image_path, "wb") as file:
+        file.write(_png_bytes())
+    jobs = "".join(json.dumps({"id": index, "path": image_path, "params": {"output_width": 10 + index}}) + "\n"
+                   for index in range(4))
+    result = subprocess.run([sys.executable, "cli.py", "--worker", "--jobs", "2", "--no-cache"], cwd=REPO_ROOT,
+                            input=jobs, capture_output=True, text=True, timeout=60)
+    
+    assert result.returncode == 0
+    responses = sorted(map(json.loads, result.stdout.splitlines()), key=lambda response: response["id"])
+    assert [response["id"] for response in responses] == [0, 1, 2, 3]
+    for index, response in enumerate(responses):
+        assert len(response["ascii"].split("\n")[0]) == 10 + index
+
+def test_worker_survives_malformed_jobs():
+    """Test that badly typed fields are answered as errors and later jobs still run."""
+    data = _png_bytes()
+    lines = [
+        json.dumps({"id": 1, "image": base64.b64encode(data).decode(), "params": {"filters": 5}}),
+        json.dumps({"id": 2, "path": 3}),
+        json.dumps({"id": {"nested": True}, "image": base64.b64encode(data).decode()}),
+        json.dumps({"id": 4, "image": base64.b64encode(data).decode(), "params": {"output_width": 20}}),
+    ]
+    output = io.StringIO()
+    Worker(output, executor=ThreadPoolExecutor(1)).run(lines)
+    
+    responses = {response["id"]: response for response in map(json.loads, output.getvalue().splitlines())}
+    assert set(responses) == {1, 2, None, 4}
+    assert "filters" in responses[1]["error"]
+    assert "path" in responses[2]["error"]
+    assert "id" in responses[None]["error"]
+    assert responses[4]["ok"]
@@ -0,0 +1,43 @@
+import numpy as np
+from PIL import ImageStat
+
+def blend_table(alpha, base):
+    """Lookup table of ``Image.blend(solid base image, image, alpha)`` for every 8-bit value.
+
+    Reproduces Pillow's arithmetic exactly: ``base + alpha * (value - base)``
+    in single precision, truncated, and clipped to 0..255 only when alpha
+    extrapolates outside 0..1. ``ImageEnhance.Brightness`` is a blend with
+    black and ``ImageEnhance.Contrast`` a blend with the mean gray.
+    """
+    alpha = np.float32(alpha)
+    values = np.float32(base) + alpha * (np.arange(256) - base).astype(np.float32)
+    if 0 <= alpha <= 1:
+        return values.astype(np.uint8)
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+def gamma_table(gamma):
+    """Lookup table raising normalized values to ``1 / gamma``; above 1 lifts the midtones."""
+    if gamma == 1:
+        return np.arange(256, dtype=np.uint8)
+    return np.round(255 * (np.arange(256) / 255) ** (1 / gamma)).astype(np.uint8)
+
+def histogram_mean(histogram):
+    """Rounded mean of an 8-bit histogram, as ``ImageEnhance.Contrast`` takes it."""
+    return int(ImageStat.Stat(histogram).mean[0] + 0.5)
+
+def tone_table(brightness=1.0, contrast=1.0, invert=False, gamma=1.0, mean=0):
+    """One 256-entry table for brightness, contrast around ``mean``, gamma and inversion.
+
+    Applied to every channel it gives the same pixels as the chain of
+    ``ImageEnhance.Brightness``, ``ImageEnhance.Contrast`` (whose ``mean`` is
+    the rounded mean gray of the brightened image, see `histogram_mean`),
+    the gamma curve and ``255 - x``, in that order.
+    """
+    table = blend_table(brightness, 0)
+    if contrast != 1:
+        table = blend_table(contrast, mean)[table]
+    if gamma != 1:
+        table = gamma_table(gamma)[table]
+    if invert:
+        table = 255 - table
+    return table
@@ -6,3 +6,10 @@ def validate_image_path(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
     if not image_path.lower().endswith((".png", ".jpg", ".jpeg")):
         raise ValueError("Unsupported image format. Use PNG or JPG.")
+
+# Formats accepted when scanning directories or glob matches for images
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+def is_image_file(path):
+    """Check if the path names a file with a supported image extension."""
+    return os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS)
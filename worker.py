@@ -0,0 +1,169 @@
+import base64
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from server import worker_converter
+
+# Outstanding jobs before reading stdin pauses
+DEFAULT_MAX_PENDING = 64
+# ASCIIConverter parameters a job may set
+JOB_PARAMS = {
+    "output_width", "density", "color", "brightness", "contrast", "gamma", "invert",
+    "detail_preservation", "intensity_window", "glyph_mode", "fast_decode", "filters",
+}
+
+# Result cache handed to this pool process by the worker
+_worker_result_cache = None
+
+def _init_worker(result_cache):
+    global _worker_result_cache
+    _worker_result_cache = result_cache
+
+def parse_job(line):
+    """Decode one NDJSON job into (id, source, params), raising ValueError if it is malformed.
+
+    A job is an object with an optional ``id``, either ``path`` (an image
+    file) or ``image`` (base64-encoded image bytes), and optional
+    ``params`` holding ASCIIConverter keyword arguments.
+    """
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON: {e}") from None
+    if not isinstance(job, dict):
+        raise ValueError("A job must be a JSON object")
+    if ("path" in job) == ("image" in job):
+        raise ValueError("A job needs exactly one of 'path' and 'image'")
+    job_id = job.get("id")
+    if job_id is not None and not isinstance(job_id, (str, int, float, bool)):
+        raise ValueError("'id' must be a string, number or boolean")
+    if "path" in job:
+        source = job["path"]
+        if not isinstance(source, str):
+            raise ValueError("'path' must be a string")
+    else:
+        try:
+            source = base64.b64decode(job["image"], validate=True)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid base64 image: {e}") from None
+    params = job.get("params", {})
+    if not isinstance(params, dict):
+        raise ValueError("'params' must be an object")
+    unknown = set(params) - JOB_PARAMS
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    if "filters" in params:
+        filters = params["filters"]
+        if not isinstance(filters, list) or not all(isinstance(name, str) for name in filters):
+            raise ValueError("'filters' must be a list of filter names")
+        params["filters"] = tuple(filters)
+    return job_id, source, params
+
+def _job_id(line):
+    """The ``id`` of a job line that could not be parsed as a job, if it has one."""
+    try:
+        job = json.loads(line)
+    except ValueError:
+        return None
+    job_id = job.get("id") if isinstance(job, dict) else None
+    return job_id if isinstance(job_id, (str, int, float, bool)) else None
+
+def _run_job(source, params, submitted):
+    """Convert one job in a pool process; returns the art and the worker-side timings."""
+    started = time.time()
+    ascii_art = worker_converter(params, _worker_result_cache)._convert(source)
+    return ascii_art, {
+        "queued_ms": (started - submitted) * 1000,
+        "convert_ms": (time.time() - started) * 1000,
+        "worker": os.getpid(),
+    }
+
+class Worker:
+    """Long-lived NDJSON conversion worker over a pool of processes.
+
+    Jobs are read one per line and submitted as soon as they arrive, so
+    many may be in flight; each response line is written as its job
+    finishes, which need not be the order the jobs came in. Responses
+    carry the job's ``id`` and either ``ascii`` or ``error``, plus
+    ``timing`` in milliseconds. At most ``max_pending`` jobs are
+    outstanding; beyond that reading pauses until one completes.
+    """
+
+    def __init__(self, output, workers=None, max_pending=DEFAULT_MAX_PENDING, result_cache=None,
+                 executor=None):
+        self.output = output
+        # Spawned rather than forked workers, as in the service
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers,
+                                                        mp_context=multiprocessing.get_context("spawn"),
+                                                        initializer=_init_worker, initargs=(result_cache,))
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._write_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def submit_line(self, line):
+        """Parse one input line and start its job, or answer at once if it is invalid."""
+        received = time.time()
+        try:
+            job_id, source, params = parse_job(line)
+        except Exception as e:
+            # One bad line must never stop the worker; answer it and read on
+            self._reject(_job_id(line), e, received)
+            return
+
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(_run_job, source, params, received)
+        except Exception as e:
+            self._slots.release()
+            self._reject(job_id, e, received)
+            return
+        future.add_done_callback(lambda future: self._finish(job_id, received, future))
+
+    def _reject(self, job_id, error, received):
+        message = str(error) if isinstance(error, ValueError) else f"{type(error).__name__}: {error}"
+        self._respond({"id": job_id, "ok": False, "error": message,
+                       "timing": {"total_ms": (time.time() - received) * 1000}})
+
+    def _finish(self, job_id, received, future):
+        try:
+            ascii_art, timing = future.result()
+            response = {"id": job_id, "ok": True, "ascii": ascii_art}
+        except Exception as e:
+            timing = {}
+            response = {"id": job_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        timing["total_ms"] = (time.time() - received) * 1000
+        response["timing"] = timing
+        try:
+            self._respond(response)
+        finally:
+            self._slots.release()
+
+    def _respond(self, response):
+        line = json.dumps(response) + "\n"
+        with self._write_lock:
+            if response["ok"]:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.output.write(line)
+            self.output.flush()
+
+    def run(self, lines):
+        """Process every line of ``lines``, then wait for the outstanding jobs."""
+        try:
+            for line in lines:
+                if line.strip():
+                    self.submit_line(line)
+        finally:
+            self.executor.shutdown(wait=True)
+
+def run_worker(input=None, output=None, workers=None, max_pending=DEFAULT_MAX_PENDING, result_cache=None):
+    """Serve NDJSON jobs from ``input`` (stdin) to ``output`` (stdout) until end of input."""
+    worker = Worker(output or sys.stdout, workers=workers, max_pending=max_pending, result_cache=result_cache)
+    worker.run(input or sys.stdin)
+    return worker